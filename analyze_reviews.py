@@ -5,6 +5,9 @@ Standalone script to analyze Google Maps reviews using AI.
 
 Usage:
     python analyze_reviews.py <path_to_csv_file>
+    python analyze_reviews.py <reviews.sqlite> [place_id] [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--category text]
+
+    Add --profile to sample the analysis and write flamegraph profiles to profiles/ next to the input.
     
 Example:
     python analyze_reviews.py C:\\Users\\5lin6\\.gemini\\antigravity\\scratch\\output\\khosh-cafe_reviews.csv
@@ -12,45 +15,92 @@ Example:
 
 import sys
 import os
+from contextlib import nullcontext
+
+from profiler import SamplingProfiler
 from review_analyzer import ReviewAnalyzer
 
+
+def analyze_store(analyzer, store_path, args):
+    """Analyze reviews from the review store, filtered by place, date range and/or category."""
+    from review_store import ReviewStore
+
+    filters = {'place_id': None, 'since': None, 'until': None, 'category': None}
+    i = 0
+    while i < len(args):
+        if args[i] in ('--since', '--until', '--category') and i + 1 < len(args):
+            filters[args[i][2:]] = args[i + 1]
+            i += 2
+        else:
+            filters['place_id'] = args[i]
+            i += 1
+
+    store = ReviewStore(store_path)
+    try:
+        output_folder = os.path.dirname(os.path.abspath(store_path))
+        return analyzer.analyze_reviews_from_store(store, output_folder, **filters)
+    finally:
+        store.close()
+
+
 def main():
+    profile = '--profile' in sys.argv
+    args = [arg for arg in sys.argv if arg != '--profile']
+
     # Check command line arguments
-    if len(sys.argv) < 2:
+    if len(args) < 2:
         print("=" * 70)
         print("GOOGLE MAPS REVIEW ANALYZER")
         print("=" * 70)
         print("\nUsage:")
         print(f"  python {os.path.basename(__file__)} <path_to_csv_file>")
+        print(f"  python {os.path.basename(__file__)} <reviews.sqlite> [place_id] [--since YYYY-MM-DD] "
+              f"[--until YYYY-MM-DD] [--category text]")
+        print("\n  --profile  write collapsed-stack and speedscope profiles of the analysis to profiles/")
         print("\nExample:")
         print(f"  python {os.path.basename(__file__)} output\\khosh-cafe_reviews.csv")
         print("\nNote: Make sure to set your OPENAI_API_KEY in a .env file or as an environment variable")
         print("=" * 70)
         sys.exit(1)
     
-    csv_path = sys.argv[1]
+    csv_path = args[1]
     
     # Check if file exists
     if not os.path.isfile(csv_path):
         print(f"[ERROR] File not found: {csv_path}")
         sys.exit(1)
     
-    # Check if it's a CSV file
-    if not csv_path.lower().endswith('.csv'):
-        print(f"[ERROR] File must be a CSV file: {csv_path}")
+    # Check if it's a CSV file or the review store
+    is_store = csv_path.lower().endswith('.sqlite')
+    if not csv_path.lower().endswith('.csv') and not is_store:
+        print(f"[ERROR] File must be a CSV file or a .sqlite review store: {csv_path}")
         sys.exit(1)
     
+    profiler = None
+    if profile:
+        profiler = SamplingProfiler(name='analyze_reviews').start()
+
     try:
         # Initialize analyzer
         print("[INFO] Initializing OpenAI analyzer...")
         analyzer = ReviewAnalyzer()
         
+        if is_store:
+            with profiler.span(os.path.basename(csv_path)) if profiler else nullcontext():
+                results = analyze_store(analyzer, csv_path, args[2:])
+            if not results:
+                print("\n[ERROR] Analysis failed or no results generated")
+                sys.exit(1)
+            print("\n[SUCCESS] Analysis complete! Results were also saved to the review store.")
+            return
+        
         # Generate output path
         output_path = csv_path.replace('.csv', '_analysis_report.txt')
         
         # Analyze reviews
         print(f"[INFO] Analyzing reviews from: {csv_path}")
-        results = analyzer.analyze_reviews_from_csv(csv_path, output_path)
+        with profiler.span(os.path.basename(csv_path)) if profiler else nullcontext():
+            results = analyzer.analyze_reviews_from_csv(csv_path, output_path)
         
         if results:
             print("\n[SUCCESS] Analysis complete!")
@@ -72,6 +122,11 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if profiler:
+            profiler.stop()
+            output_folder = os.path.dirname(os.path.abspath(csv_path))
+            profiler.write(SamplingProfiler.base_path_for(output_folder, 'analyze'))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from collections import deque
+
+
+class ArtifactPolicy:
+    """
+    Decides when debug screenshots and page sources are captured.
+
+    Modes:
+        'off'        - never capture anything.
+        'on-failure' - keep cheap snapshots (step, URL, title) in memory and only
+                       take a screenshot + page source when a step fails.
+        'sampled'    - like 'on-failure', plus a full capture of every step for
+                       1 in every `sample_every` keywords.
+    """
+
+    MODES = ('off', 'on-failure', 'sampled')
+
+    def __init__(self, mode='on-failure', sample_every=50, ring_size=8):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid artifact mode '{mode}'. Use one of: {', '.join(self.MODES)}")
+        self.mode = mode
+        self.sample_every = max(1, sample_every)
+        self.ring_size = ring_size
+
+
+class ArtifactRecorder:
+    """Per-worker ring buffer of recent snapshots, written to unique per-keyword paths."""
+
+    def __init__(self, policy, output_folder, worker_id=0):
+        self.policy = policy
+        self.output_dir = os.path.join(output_folder, 'debug')
+        self.worker_id = worker_id
+        self.ring = deque(maxlen=policy.ring_size)
+        self.keyword_count = 0
+        self.filename = ''
+        self.full_capture = False
+
+    def begin(self, filename):
+        """Start a new keyword. filename is the keyword's filesystem-safe base name."""
+        self.keyword_count += 1
+        self.filename = filename
+        self.ring.clear()
+        self.full_capture = (self.policy.mode == 'sampled' and self.keyword_count % self.policy.sample_every == 0)
+
+    def snapshot(self, driver, step):
+        """Record the state after a step. Only sampled keywords pay for screenshot/page source."""
+        if self.policy.mode == 'off':
+            return
+        self.ring.append(self._capture(driver, step, self.full_capture))
+
+    def failure(self, driver, step, error=None):
+        """A step failed: capture the current page in full and write the ring to disk."""
+        if self.policy.mode == 'off':
+            return
+        entry = self._capture(driver, step, True)
+        entry['error'] = str(error) if error else ''
+        self.ring.append(entry)
+        self.flush('FAILED')
+
+    def end(self):
+        """Finish the keyword: sampled keywords are written even if nothing failed."""
+        if self.full_capture and self.ring:
+            self.flush('SAMPLED')
+        self.ring.clear()
+
+    def _capture(self, driver, step, full):
+        entry = {'step': step, 'time': time.strftime('%H:%M:%S'), 'url': '', 'title': ''}
+        try:
+            entry['url'] = driver.current_url
+            entry['title'] = driver.title
+            if full:
+                entry['screenshot'] = driver.get_screenshot_as_png()
+                entry['html'] = driver.page_source
+        except Exception as e:
+            entry['error'] = f'capture failed: {e}'
+        return entry
+
+    def flush(self, reason):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            prefix = os.path.join(self.output_dir, f'{self.filename or "keyword"}__w{self.worker_id}')
+
+            with open(f'{prefix}.txt', 'w', encoding='utf-8') as f:
+                f.write(f'{reason}\n')
+                for idx, entry in enumerate(self.ring, 1):
+                    f.write(f"{idx:02d} {entry['time']} {entry['step']} {entry['url']} | {entry['title']}")
+                    if entry.get('error'):
+                        f.write(f" | ERROR: {entry['error']}")
+                    f.write('\n')
+
+                    if 'screenshot' in entry:
+                        with open(f"{prefix}_{idx:02d}_{entry['step']}.png", 'wb') as img:
+                            img.write(entry['screenshot'])
+                    if 'html' in entry:
+                        with open(f"{prefix}_{idx:02d}_{entry['step']}.html", 'w', encoding='utf-8') as html:
+                            html.write(entry['html'])
+
+            print(f"[DEBUG] Saved {reason.lower()} debug artifacts to: {prefix}.*")
+        except Exception as e:
+            print(f"[DEBUG] Failed to save debug artifacts: {e}")
+        self.ring.clear()
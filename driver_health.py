@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class DriverHealth:
+    """
+    Tracks the health of one worker's Chrome session and decides when to recycle it.
+
+    Long-lived sessions leak memory and slow down, so a driver is recycled after
+    serving max_places, when Chrome's RSS passes max_rss_mb, when the average of
+    the recent per-place latencies passes max_latency, or after
+    max_consecutive_failures failed places in a row. RSS needs psutil.
+    """
+
+    def __init__(self, max_places=150, max_rss_mb=1500, max_latency=120.0, max_consecutive_failures=3,
+                 latency_window=10):
+        self.max_places = max_places
+        self.max_rss_mb = max_rss_mb
+        self.max_latency = max_latency
+        self.max_consecutive_failures = max_consecutive_failures
+        self.latencies = deque(maxlen=latency_window)
+        self.places_served = 0
+        self.consecutive_failures = 0
+
+    def reset(self):
+        """Start tracking a fresh driver."""
+        self.latencies.clear()
+        self.places_served = 0
+        self.consecutive_failures = 0
+
+    def record(self, elapsed, success):
+        self.places_served += 1
+        self.latencies.append(elapsed)
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+    def rss_mb(self, driver):
+        """RSS of chromedriver and every Chrome process under it, in MB (None if unknown)."""
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            rss = root.memory_info().rss
+            for child in root.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return rss / (1024 * 1024)
+        except Exception:
+            return None
+
+    def recycle_reason(self, driver):
+        """Why the driver should be recycled now, or None if it is healthy."""
+        if self.consecutive_failures >= self.max_consecutive_failures:
+            return f'{self.consecutive_failures} consecutive failures'
+        if self.places_served >= self.max_places:
+            return f'served {self.places_served} places'
+        if len(self.latencies) == self.latencies.maxlen:
+            avg_latency = sum(self.latencies) / len(self.latencies)
+            if avg_latency > self.max_latency:
+                return f'average latency {avg_latency:.0f}s'
+        rss = self.rss_mb(driver)
+        if rss is not None and rss > self.max_rss_mb:
+            return f'Chrome RSS {rss:.0f} MB'
+        return None
@@ -1,43 +1,245 @@
 # -*- coding: utf-8 -*-
 
+import csv
+import os
+
 import xlwt
 
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+except ImportError:
+    Workbook = None
+    ILLEGAL_CHARACTERS_RE = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from place_maps import Review
+
+# (header, MapsPlace field, column type)
+PLACE_COLUMNS = [
+    ('KEYWORD', 'keyword', 'string'),
+    ('NAME', 'name', 'string'),
+    ('CATEGORY', 'category', 'string'),
+    ('ADDRESS', 'address', 'string'),
+    ('PHONE', 'phone', 'string'),
+    ('WEB', 'web', 'string'),
+    ('PLUS CODE', 'pluscode', 'string'),
+    ('OPEN HOURS', 'hours', 'string'),
+    ('STARS', 'stars', 'float'),
+    ('REVIEWS', 'reviews', 'int'),
+    ('URL', 'url', 'string'),
+    ('PLACE ID', 'place_id', 'string'),
+]
+
+# Every review row carries the place it belongs to, so one dataset can hold all of them
+REVIEW_COLUMNS = ['keyword', 'place_name', 'place_id'] + list(Review.FIELDS)
+REVIEW_TYPES = ['string', 'string', 'string', 'string', 'string', 'float', 'string', 'string', 'date']
+
+XLS_MAX_ROWS = 65536
+XLSX_MAX_ROWS = 1048576
+
+
+def require_format(fmt):
+    """Raise early (before a long run) if the library a format needs is missing."""
+    if fmt not in MapDataExporter.FORMATS:
+        raise ValueError(f'Unknown export format: {fmt} (expected one of {", ".join(MapDataExporter.FORMATS)})')
+    if fmt == 'xlsx' and Workbook is None:
+        raise ImportError('openpyxl is required for XLSX export: pip install openpyxl')
+    if fmt == 'parquet' and pa is None:
+        raise ImportError('pyarrow is required for Parquet export: pip install pyarrow')
+
+
+class CsvTableWriter:
+    def __init__(self, path, headers, types=None):
+        self.path = path
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write_batch(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetTableWriter:
+    """Appends one row group per batch, so memory is bounded by the batch size."""
+
+    def __init__(self, path, headers, types=None):
+        arrow_types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'date': pa.date32()}
+        self.path = path
+        self.headers = headers
+        types = types or ['string'] * len(headers)
+        self.schema = pa.schema([(header, arrow_types[t]) for header, t in zip(headers, types)])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write_batch(self, rows):
+        columns = list(zip(*rows)) if rows else [()] * len(self.headers)
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)], schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class XlsxTableWriter:
+    """
+    Write-only (streaming) worksheet: rows go straight to the file instead of
+    being kept as cell objects. Rolls over to a new sheet at the XLSX row limit.
+    Control characters, which XLSX cannot hold (openpyxl raises on them), are
+    stripped from text cells.
+    """
+
+    def __init__(self, workbook, title, headers):
+        self.workbook = workbook
+        self.title = title
+        self.headers = headers
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        self.sheet = self.workbook.create_sheet(self.title if self.sheets == 1 else f'{self.title}_{self.sheets}')
+        self.sheet.append(self.headers)
+        self.rows = 1
+
+    def write_batch(self, rows):
+        for row in rows:
+            if self.rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append([ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value
+                               for value in row])
+            self.rows += 1
+
+    def close(self):
+        pass
+
+
+class XlsTableWriter:
+    """Legacy .xls sheet through xlwt (kept in memory, capped at 65,536 rows)."""
+
+    def __init__(self, workbook, title, headers):
+        self.sheet = workbook.add_sheet(title, cell_overwrite_ok=True)
+        self.rows = 0
+        self.write_batch([headers])
+
+    def write_batch(self, rows):
+        for row in rows:
+            if self.rows >= XLS_MAX_ROWS:
+                raise ValueError(f'.xls holds at most {XLS_MAX_ROWS} rows, use the xlsx, csv or parquet format')
+            for col, value in enumerate(row):
+                self.sheet.write(self.rows, col, value)
+            self.rows += 1
+
+    def close(self):
+        pass
+
 
 class MapDataExporter:
-    """Exports scraped Google Maps data to an Excel file."""
+    """
+    Exports scraped Google Maps data as XLSX, CSV, Parquet or legacy XLS.
+
+    Places and their reviews are written in batches of batch_size rows, and the
+    per-keyword review CSVs are consolidated into one reviews dataset, read a
+    batch at a time. places_list may be any iterable (e.g. a streamed sink), so
+    memory stays bounded however many places and reviews there are.
+    """
 
-    def __init__(self, filename, path, places_list):
-        self.filename = filename
+    FORMATS = ('xlsx', 'csv', 'parquet', 'xls')
+
+    def __init__(self, filename, path, places_list, batch_size=5000):
+        """
+        Args:
+            filename: Output base name; any extension is replaced by the format's.
+            path: Output folder.
+            places_list: Iterable of MapsPlace.
+            batch_size: Rows buffered before they are handed to the writer.
+        """
+        self.filename = os.path.splitext(filename)[0]
         self.path = path
         self.places_list = places_list
+        self.batch_size = batch_size
+
+    def export(self, fmt='xlsx', include_reviews=True):
+        """
+        Write the places (and, with include_reviews, every review) in the given format.
+        XLSX and XLS get a places and a reviews sheet in one workbook; CSV and Parquet
+        get <name>.<fmt> and <name>_reviews.<fmt>. Returns the paths written.
+        """
+        require_format(fmt)
+        base = os.path.join(self.path, self.filename)
+
+        if fmt in ('xlsx', 'xls'):
+            workbook = Workbook(write_only=True) if fmt == 'xlsx' else xlwt.Workbook(encoding='utf-8')
+            writer_class = XlsxTableWriter if fmt == 'xlsx' else XlsTableWriter
+            places_writer = writer_class(workbook, 'places', [header for header, _, _ in PLACE_COLUMNS])
+            review_sources = self._write_places(places_writer)
+            if include_reviews:
+                reviews_writer = writer_class(workbook, 'reviews', REVIEW_COLUMNS)
+                review_count = self._write_reviews(reviews_writer, review_sources)
+            workbook.save(f'{base}.{fmt}')
+            paths = [f'{base}.{fmt}']
+        else:
+            writer_class = CsvTableWriter if fmt == 'csv' else ParquetTableWriter
+            places_writer = writer_class(f'{base}.{fmt}', [field for _, field, _ in PLACE_COLUMNS],
+                                         [t for _, _, t in PLACE_COLUMNS])
+            review_sources = self._write_places(places_writer)
+            places_writer.close()
+            paths = [places_writer.path]
+            if include_reviews:
+                reviews_writer = writer_class(f'{base}_reviews.{fmt}', REVIEW_COLUMNS, REVIEW_TYPES)
+                review_count = self._write_reviews(reviews_writer, review_sources)
+                reviews_writer.close()
+                paths.append(reviews_writer.path)
+
+        reviews_note = f' and {review_count} review(s)' if include_reviews else ''
+        print(f'[INFO] Exported {len(review_sources)} place(s){reviews_note} to {", ".join(paths)}')
+        return paths
 
     def export_excel(self):
-        workbook = xlwt.Workbook(encoding='utf-8')
-        sheet = workbook.add_sheet("document", cell_overwrite_ok=True)
-
-        sheet.write(0, 0, 'KEYWORD')
-        sheet.write(0, 1, 'NAME')
-        sheet.write(0, 2, 'CATEGORY')
-        sheet.write(0, 3, 'ADDRESS')
-        sheet.write(0, 4, 'PHONE')
-        sheet.write(0, 5, 'WEB')
-        sheet.write(0, 6, 'PLUS CODE')
-        sheet.write(0, 7, 'OPEN HOURS')
-        sheet.write(0, 8, 'STARS')
-        sheet.write(0, 9, 'REVIEWS')
-
-        row = 1
+        """Places only, as a legacy .xls workbook."""
+        return self.export('xls', include_reviews=False)
+
+    def _write_places(self, writer):
+        """Write place rows; returns (keyword, name, place_id, csv_path) of each place for the review pass."""
+        review_sources = []
+        batch = []
         for place in self.places_list:
-            sheet.write(row, 0, place.keyword)
-            sheet.write(row, 1, place.name)
-            sheet.write(row, 2, place.category)
-            sheet.write(row, 3, place.address)
-            sheet.write(row, 4, place.phone)
-            sheet.write(row, 5, place.web)
-            sheet.write(row, 6, place.pluscode)
-            sheet.write(row, 7, place.hours)
-            sheet.write(row, 8, place.stars)
-            sheet.write(row, 9, place.reviews)
-            row += 1
-
-        workbook.save(self.path + self.filename)
+            batch.append([getattr(place, field) for _, field, _ in PLACE_COLUMNS])
+            review_sources.append((place.keyword, place.name, place.place_id, place.csv_path))
+            if len(batch) >= self.batch_size:
+                writer.write_batch(batch)
+                batch = []
+        if batch:
+            writer.write_batch(batch)
+        return review_sources
+
+    def _write_reviews(self, writer, review_sources):
+        """Stream every place's review CSV into one dataset. Returns the number of reviews written."""
+        count = 0
+        batch = []
+        seen_paths = set()
+        for keyword, name, place_id, csv_path in review_sources:
+            # Keywords merged into the same place share a review file
+            if not csv_path or csv_path in seen_paths or not os.path.isfile(csv_path):
+                continue
+            seen_paths.add(csv_path)
+            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    review = Review.from_row(row)
+                    batch.append([keyword, name, place_id] + [getattr(review, field) for field in Review.FIELDS])
+                    if len(batch) >= self.batch_size:
+                        writer.write_batch(batch)
+                        count += len(batch)
+                        batch = []
+        if batch:
+            writer.write_batch(batch)
+            count += len(batch)
+        return count
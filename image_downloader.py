@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ImageDownloader:
+    """
+    Downloads place images in the background so browser workers never block on HTTP.
+
+    Uses a bounded thread pool over one pooled requests.Session (keep-alive),
+    and skips work it already has: URLs are deduplicated by URL hash before
+    download and images by content hash after download.
+    """
+
+    def __init__(self, max_workers=4, max_pending=200, timeout=15):
+        """
+        Args:
+            max_workers: Number of download threads.
+            max_pending: Maximum queued + running downloads; submit() blocks when reached.
+            timeout: Per-request timeout in seconds.
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='img')
+        self.slots = BoundedSemaphore(max_pending)
+        self.lock = Lock()
+        self.url_hashes = set()
+        self.content_hashes = {}
+        self.stats = {'submitted': 0, 'saved': 0, 'skipped': 0, 'failed': 0}
+
+    @staticmethod
+    def url_hash(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def submit(self, url, path):
+        """
+        Queue url to be saved at path. Returns False if it was skipped as a duplicate
+        or already exists on disk, True if it was queued.
+        """
+        key = self.url_hash(url)
+        with self.lock:
+            if key in self.url_hashes or os.path.exists(path):
+                self.stats['skipped'] += 1
+                return False
+            self.url_hashes.add(key)
+            self.stats['submitted'] += 1
+
+        self.slots.acquire()
+        future = self.executor.submit(self._download, url, path)
+        future.add_done_callback(lambda _: self.slots.release())
+        return True
+
+    def _download(self, url, path):
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            content = response.content
+
+            digest = hashlib.sha1(content).hexdigest()
+            with self.lock:
+                existing = self.content_hashes.get(digest)
+                if existing is None:
+                    self.content_hashes[digest] = path
+            if existing is not None:
+                print(f"[DEBUG] Image for {path} is identical to {existing}, skipped")
+                with self.lock:
+                    self.stats['skipped'] += 1
+                return
+
+            with open(path, 'wb') as f:
+                f.write(content)
+            with self.lock:
+                self.stats['saved'] += 1
+            print(f"[DEBUG] Image saved: {path}")
+        except Exception as e:
+            with self.lock:
+                self.stats['failed'] += 1
+            print(f"[DEBUG] Unable to download image {url}: {e}")
+
+    def close(self, wait=True):
+        """Wait for pending downloads (if wait) and release the connection pool."""
+        self.executor.shutdown(wait=wait)
+        self.session.close()
+        print(f"[INFO] Images: {self.stats['saved']} saved, {self.stats['skipped']} skipped, "
+              f"{self.stats['failed']} failed")
@@ -2,43 +2,290 @@
 
 import os
 import glob
-from threading import Thread
-
-from export_data import MapDataExporter
+import multiprocessing
+import sys
+import time
+from contextlib import nullcontext
+from queue import Queue, Empty
+from threading import Event, Thread, Lock
+
+from debug_artifacts import ArtifactPolicy
+from driver_health import DriverHealth
+from export_data import MapDataExporter, require_format
+from image_downloader import ImageDownloader
 from maps_data_scraper import GoogleMapsDataScraper
+from metrics import MetricsRegistry
+from place_cache import PlaceCache, is_place_url
+from profiler import SamplingProfiler
+from rate_limiter import RateLimiter, SharedRateLimiter
+from resource_governor import ResourceGovernor
+from result_sink import SINKS
+from review_store import ReviewStore
+from selector_registry import SelectorRegistry
+from run_journal import RunJournal
+from wait_policy import WaitPolicy
+
+DEFAULT_WORKERS = 4
+QUEUE_TIMEOUT = 1
+MAX_REQUEUES = 2
+
+
+class ScrapeProgress:
+    """Thread-safe progress counter shared by all scraper workers of a run."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.ok = 0
+        self.lock = Lock()
+        # Set once every keyword (and every place queued by a harvest) is reported
+        self.finished = Event()
+        if total == 0:
+            self.finished.set()
+
+    def report(self, worker_id, kw, success):
+        with self.lock:
+            self.done += 1
+            if success:
+                self.ok += 1
+            status = 'OK' if success else 'ERROR'
+            print(f'Worker #{worker_id}  {self.done}/{self.total} - {status} - {kw}')
+            if self.done >= self.total:
+                self.finished.set()
+
+    def add(self, count):
+        """More work was discovered during the run (places queued by a results harvest)."""
+        with self.lock:
+            self.total += count
+
+
+def scrape_maps(language, keyword_queue, output_folder, worker_id, on_result, scraper_options=None, stop_event=None,
+                on_harvest=None, profiler=None):
+    """
+    Worker loop: keeps pulling keywords from the shared queue until it is empty
+    (or stop_event is set), so no worker idles while others still have work.
+    Each finished keyword is passed to on_result(worker_id, kw, place), with
+    place None on failure. If on_harvest is given, search keywords are harvested
+    instead and on_harvest(worker_id, kw, places) gets every result of the search
+    (places None on failure); place URLs are still scraped in full. While
+    harvesting, an empty queue does not end the loop, since a harvest running on
+    another worker may still queue places: the worker waits for stop_event. The browser
+    is recycled when DriverHealth says so, and a keyword lost to a hung or
+    broken driver is put back on the queue. With a profiler, each keyword's
+    samples are labelled with the keyword.
+    """
+    scraper = GoogleMapsDataScraper(language, output_folder, worker_id=worker_id, **(scraper_options or {}))
+    if not scraper.init_driver():
+        # Leave the keywords to the workers that did get a browser
+        print(f'Worker #{worker_id} - could not start Chrome, stopping')
+        return
 
+    health = DriverHealth()
+    requeues = {}
 
-def split_list(lst, n):
-    """Split a list into n roughly equal parts."""
-    k, m = divmod(len(lst), n)
-    return list((lst[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(n)))
-
-
-def scrape_maps(language, keywords, output_folder, results, thread_id):
-    scraper = GoogleMapsDataScraper(language, output_folder)
-    scraper.init_driver()
-    places = []
-
-    count = 1
-    for kw in keywords:
-        place = scraper.scrape_place(kw)
+    while stop_event is None or not stop_event.is_set():
+        try:
+            kw = keyword_queue.get(timeout=QUEUE_TIMEOUT)
+        except Empty:
+            if on_harvest is not None and stop_event is not None:
+                continue
+            break
 
-        if place is not None:
-            print(f'Thread #{thread_id}  {count}/{len(keywords)} - OK - {kw}')
-            places.append(place)
+        harvest = on_harvest is not None and not is_place_url(kw)
+        start = time.perf_counter()
+        with profiler.span(kw) if profiler else nullcontext():
+            result = scraper.harvest_results(kw) if harvest else scraper.scrape_place(kw)
+        elapsed = time.perf_counter() - start
+        health.record(elapsed, result is not None)
+        scraper.metrics.observe('harvest_total' if harvest else 'keyword_total', elapsed)
+
+        if result is None and scraper.driver_error and requeues.get(kw, 0) < MAX_REQUEUES:
+            requeues[kw] = requeues.get(kw, 0) + 1
+            print(f'Worker #{worker_id} - driver failure, re-queueing: {kw}')
+            keyword_queue.put(kw)
+            scraper.metrics.inc('requeues')
+            reason = 'driver failure'
         else:
-            print(f'Thread #{thread_id}  {count}/{len(keywords)} - ERROR - {kw}')
-        count += 1
+            (on_harvest if harvest else on_result)(worker_id, kw, result)
+            reason = health.recycle_reason(scraper.driver)
+
+        if reason:
+            print(f'Worker #{worker_id} - recycling Chrome ({reason})')
+            scraper.metrics.inc('driver_recycles')
+            health.reset()
+            if not scraper.restart_driver():
+                print(f'Worker #{worker_id} - could not restart Chrome, stopping')
+                return
 
-    results[thread_id] = places
     scraper.quit_driver()
 
 
-def analyze_all_reviews(output_folder, csv_files=None):
+def process_worker(language, output_folder, keyword_queue, result_queue, worker_id, process_options, stop_event,
+                   harvest=False):
+    """
+    Entry point of a scraper process. Builds its own wait policy, image downloader,
+    place cache and metrics, and sends every result (or harvest) back to the parent
+    over result_queue; timings, selector stats and metrics go back when it exits.
+    With a profile_path in process_options, the process profiles itself to
+    <profile_path>_p<worker_id>.
+    """
+    process_options = dict(process_options)
+    profile_path = process_options.pop('profile_path', None)
+    store_path = process_options.pop('review_store_path', None)
+    store_run_id = process_options.pop('review_store_run_id', None)
+    rate_limit_rpm = process_options.pop('rate_limit_rpm', None)
+    profiler = SamplingProfiler(name=f'worker-{worker_id}').start() if profile_path else None
+
+    # Every process draws from the same request budget, kept in a file
+    rate_limiter = None
+    if rate_limit_rpm:
+        rate_limiter = SharedRateLimiter(SharedRateLimiter.path_for(output_folder), rate_limit_rpm)
+    wait_policy = WaitPolicy(rate_limiter=rate_limiter)
+    image_downloader = ImageDownloader()
+    place_cache = PlaceCache(PlaceCache.path_for(output_folder))
+    selector_registry = SelectorRegistry()
+    metrics = MetricsRegistry()
+    review_store = ReviewStore(store_path, store_run_id) if store_path else None
+    scraper_options = dict(process_options, wait_policy=wait_policy, image_downloader=image_downloader,
+                           place_cache=place_cache, selector_registry=selector_registry, review_store=review_store,
+                           metrics=metrics)
+
+    def send_result(wid, kw, place):
+        result_queue.put(('result', wid, kw, place))
+
+    def send_harvest(wid, kw, places):
+        result_queue.put(('harvest', wid, kw, places))
+
+    try:
+        scrape_maps(language, keyword_queue, output_folder, worker_id, send_result, scraper_options, stop_event,
+                    send_harvest if harvest else None, profiler)
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.write(f'{profile_path}_p{worker_id}')
+        image_downloader.close()
+        place_cache.close()
+        if review_store:
+            review_store.close()
+        if rate_limiter:
+            rate_limiter.close()
+        result_queue.put(('exit', worker_id, dict(wait_policy.timings), selector_registry.snapshot(),
+                          metrics.snapshot()))
+
+
+def run_process_pool(language, keywords, output_folder, process_options, on_result, wait_policy, selector_registry,
+                     governor, on_harvest=None, metrics=None):
+    """
+    Scrape keywords with one Chrome per process. The pool starts with one process
+    and lets the governor add or retire processes as memory and CPU allow.
+    Results are collected here over a queue and handed to on_result. With
+    on_harvest, searches are harvested and the place URLs it returns are queued;
+    idle workers are then only stopped once no keyword or harvest is outstanding.
+    Each process's metrics are merged into metrics when it exits. A worker that
+    exits without scraping anything (no Chrome) stops the pool instead of being
+    replaced.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    keyword_queue = ctx.Queue()
+    for kw in keywords:
+        keyword_queue.put(kw)
+    result_queue = ctx.Queue()
+
+    workers = {}
+    next_id = 0
+    remaining = len(keywords)
+    last_scaling = time.monotonic()
+    # Workers that sent at least one result or harvest
+    reported = set()
+    requeued = False
+    failed = False
+
+    def start_worker():
+        nonlocal next_id
+        stop_event = ctx.Event()
+        process = ctx.Process(target=process_worker, args=(language, output_folder, keyword_queue, result_queue,
+                                                           next_id, process_options, stop_event,
+                                                           on_harvest is not None))
+        process.start()
+        workers[next_id] = (process, stop_event)
+        next_id += 1
+
+    for _ in range(governor.min_workers):
+        start_worker()
+
+    while workers:
+        try:
+            message = result_queue.get(timeout=QUEUE_TIMEOUT)
+        except Empty:
+            message = None
+
+        if message and message[0] == 'result':
+            _, worker_id, kw, place = message
+            on_result(worker_id, kw, place)
+            reported.add(worker_id)
+            remaining -= 1
+        elif message and message[0] == 'harvest':
+            _, worker_id, kw, places = message
+            for url in on_harvest(worker_id, kw, places):
+                keyword_queue.put(url)
+                remaining += 1
+                requeued = True
+            reported.add(worker_id)
+            remaining -= 1
+        elif message and message[0] == 'exit':
+            _, worker_id, timings, selector_stats, worker_metrics = message
+            wait_policy.merge(timings)
+            selector_registry.merge(selector_stats)
+            if metrics is not None:
+                metrics.merge(worker_metrics)
+            process, stop_event = workers.pop(worker_id)
+            process.join()
+            if worker_id not in reported and not stop_event.is_set() and remaining > 0 and not failed:
+                # Typically Chrome could not start: another worker would fail the same way
+                print(f'[ERROR] Worker #{worker_id} exited without scraping anything, '
+                      f'stopping with {remaining} keyword(s) left')
+                failed = True
+                for _, other_stop_event in workers.values():
+                    other_stop_event.set()
+
+        # A process that died without saying goodbye crashed (its keyword stays pending in the journal)
+        for worker_id, (process, _) in list(workers.items()):
+            if not process.is_alive() and process.exitcode not in (None, 0):
+                print(f'Worker #{worker_id} - process crashed (exit code {process.exitcode})')
+                workers.pop(worker_id)
+                remaining -= 1
+
+        if remaining <= 0:
+            # Nothing left and no harvest running: let the idle workers go
+            for _, stop_event in workers.values():
+                stop_event.set()
+
+        # Every worker ran dry just before a harvest queued more places
+        if requeued and not failed and not workers and remaining > 0 and not keyword_queue.empty():
+            requeued = False
+            start_worker()
+
+        active = [wid for wid, (_, stop_event) in workers.items() if not stop_event.is_set()]
+        if not failed and remaining > 0 and time.monotonic() - last_scaling >= governor.interval:
+            last_scaling = time.monotonic()
+            target = governor.target(len(active))
+            if target > len(active) and remaining > len(active):
+                start_worker()
+            elif target < len(active):
+                # Retire the newest worker once it finishes its current keyword
+                workers[max(active)][1].set()
+
+
+def analyze_all_reviews(output_folder, csv_files=None, review_store=None, place_ids=None, metrics=None,
+                        profiler=None):
     """
     Automatically analyze review CSV files.
     If csv_files is provided, only those specific files are analyzed.
     Otherwise, all review CSV files in the output folder are found.
+    If review_store and place_ids are given, those places are analyzed from the
+    store instead (results are saved back to it) and csv_files covers the rest.
+    API call timings and token counts go to metrics, if given, and profiler
+    samples are labelled with the file or place being analyzed.
     """
     try:
         from review_analyzer import ReviewAnalyzer
@@ -47,17 +294,18 @@ def analyze_all_reviews(output_folder, csv_files=None):
             csv_pattern = os.path.join(output_folder, '*_reviews.csv')
             csv_files = glob.glob(csv_pattern)
 
-        if not csv_files:
+        place_ids = list(place_ids or []) if review_store else []
+        if not csv_files and not place_ids:
             print('\n[INFO] No review CSV files found to analyze.')
             return
 
         print(f'\n{"=" * 70}')
         print('STARTING AUTOMATIC REVIEW ANALYSIS')
         print(f'{"=" * 70}')
-        print(f'Found {len(csv_files)} review file(s) to analyze\n')
+        print(f'Found {len(csv_files) + len(place_ids)} place(s) to analyze\n')
 
         try:
-            analyzer = ReviewAnalyzer()
+            analyzer = ReviewAnalyzer(metrics=metrics)
         except ValueError as e:
             print(f'[WARNING] Could not initialize analyzer: {e}')
             print('[INFO] Skipping automatic analysis. You can run it manually later with:')
@@ -69,12 +317,25 @@ def analyze_all_reviews(output_folder, csv_files=None):
             print('-' * 70)
 
             try:
-                analyzer.analyze_reviews_from_csv(csv_file)
+                with profiler.span(os.path.basename(csv_file)) if profiler else nullcontext():
+                    analyzer.analyze_reviews_from_csv(csv_file)
                 print(f'[SUCCESS] Analysis complete for {os.path.basename(csv_file)}')
             except Exception as e:
                 print(f'[ERROR] Failed to analyze {os.path.basename(csv_file)}: {e}')
                 continue
 
+        for place_id in place_ids:
+            print(f'\n[INFO] Analyzing place: {place_id}')
+            print('-' * 70)
+
+            try:
+                with profiler.span(place_id) if profiler else nullcontext():
+                    analyzer.analyze_reviews_from_store(review_store, output_folder, place_id=place_id)
+                print(f'[SUCCESS] Analysis complete for {place_id}')
+            except Exception as e:
+                print(f'[ERROR] Failed to analyze {place_id}: {e}')
+                continue
+
         print(f'\n{"=" * 70}')
         print('AUTOMATIC REVIEW ANALYSIS COMPLETE')
         print(f'{"=" * 70}\n')
@@ -84,35 +345,210 @@ def analyze_all_reviews(output_folder, csv_files=None):
         print('[INFO] To enable automatic analysis, ensure review_analyzer.py is in the same directory.')
 
 
-def run_google_maps_scraper(language, keywords_file, output_folder, auto_analyze=True):
-    with open(keywords_file, 'r', encoding='utf-8') as f:
-        keywords = f.read().splitlines()
-
-    num_threads = 4
-    threads = [None] * num_threads
-    results = [None] * num_threads
-    keyword_chunks = split_list(keywords, num_threads)
-
-    for i in range(num_threads):
-        threads[i] = Thread(target=scrape_maps, args=(language, keyword_chunks[i], output_folder, results, i,))
-        threads[i].start()
-
-    for i in range(num_threads):
-        threads[i].join()
+def run_google_maps_scraper(language, keywords_file, output_folder, auto_analyze=True, num_workers=DEFAULT_WORKERS,
+                            lean=False, artifacts='on-failure', incremental=False, mode='threads',
+                            save_snapshots=False, review_source='dom', harvest=False, harvest_details=False,
+                            sink_format='jsonl', export_format='xlsx', use_review_store=True, rate_limit_rpm=None,
+                            metrics_format='json', profile=False):
+    """
+    Scrape every keyword in keywords_file. With harvest, each keyword is a search
+    whose whole results list is read in one pass (name, stars, reviews, category,
+    url); with harvest_details every harvested place is then also scraped in full.
+    Places are streamed to <keywords>.places.<sink_format> as they finish; at the
+    end, every place the journal holds and all their reviews are exported as
+    export_format (xlsx, csv, parquet or xls; None to skip). With use_review_store,
+    places and reviews also go to the reviews.sqlite warehouse. rate_limit_rpm caps
+    navigations and searches per minute across all workers (None: politeness pauses only).
+    The run ends with a p50/p95/p99 breakdown per phase, also written to
+    metrics_<timestamp>.<json|prom> as metrics_format says (None to skip the file).
+    With profile, every worker thread (or process) is sampled and the profiles are
+    written to profiles/ as collapsed stacks and speedscope JSON.
+    """
+    if export_format:
+        # Fail now rather than after hours of scraping
+        require_format(export_format)
 
-    all_places = []
-    for i in range(num_threads):
-        all_places += results[i]
+    with open(keywords_file, 'r', encoding='utf-8') as f:
+        keywords = [kw for kw in f.read().splitlines() if kw.strip()]
+
+    profiler = None
+    if profile:
+        profile_path = SamplingProfiler.base_path_for(output_folder, 'run')
+        profiler = SamplingProfiler(name='main').start()
+
+    journal = RunJournal(RunJournal.path_for(output_folder, keywords_file))
+    journal.register(keywords)
+    keyword_set = set(keywords)
+    pending = journal.pending(keyword_set)
+    new_run = False
+    if keywords and not pending:
+        print('----------\nPrevious run of this keywords file is complete, starting a new run')
+        journal.restart()
+        pending = journal.pending(keyword_set)
+        new_run = True
+    if len(pending) < len(keyword_set):
+        print(f'----------\nResuming run: {len(keyword_set) - len(pending)} keywords already done, {len(pending)} to go')
+
+    # No point starting more browsers than there are keywords (unless harvests will queue more)
+    if not harvest_details:
+        num_workers = max(1, min(num_workers, len(pending)))
+    progress = ScrapeProgress(len(pending))
+    # Process workers build their own (file-backed) limiter from process_options
+    rate_limiter = RateLimiter(rate_limit_rpm) if rate_limit_rpm and mode != 'processes' else None
+    wait_policy = WaitPolicy(rate_limiter=rate_limiter)
+    selector_registry = SelectorRegistry()
+    metrics = MetricsRegistry()
+    run_started = time.strftime('%Y%m%d-%H%M%S')
+    session_places = []
+    review_store = ReviewStore(ReviewStore.path_for(output_folder)) if use_review_store else None
+    if review_store:
+        review_store.start_run(keywords_file)
+    sink_class = SINKS[sink_format]
+    sink_path = sink_class.path_for(output_folder, keywords_file)
+    # A resumed run keeps appending to the stream of the interrupted one
+    sink = sink_class(sink_path, fresh=new_run)
+    if not new_run:
+        # The journal commits each place at once, but a crash loses the places still buffered by the sink
+        streamed = {sink_class.key(place) for place in sink_class.read_places(sink_path)}
+        for place in journal.completed_places():
+            if sink_class.key(place) not in streamed:
+                sink.write(place)
+
+    def on_result(worker_id, kw, place):
+        if place is not None:
+            if is_place_url(kw):
+                place.keyword = journal.source(kw) or kw
+            session_places.append(place)
+            sink.write(place)
+            journal.mark_done(kw, place)
+        else:
+            journal.mark_failed(kw)
+        progress.report(worker_id, kw, place is not None)
+
+    def on_harvest(worker_id, kw, places):
+        """Journal a harvested search; returns the place URLs to scrape in full."""
+        if places is None:
+            journal.mark_failed(kw)
+            progress.report(worker_id, kw, False)
+            return []
+        queued = journal.add_harvest(kw, places, harvest_details)
+        if not harvest_details:
+            session_places.extend(places)
+            for place in places:
+                sink.write(place)
+        progress.add(len(queued))
+        progress.report(worker_id, f'{kw} ({len(places)} places)', True)
+        return queued
+
+    if mode == 'processes':
+        process_options = {
+            'lean': lean,
+            'artifact_policy': ArtifactPolicy(artifacts),
+            'incremental': incremental,
+            'save_snapshots': save_snapshots,
+            'review_source': review_source,
+            'rate_limit_rpm': rate_limit_rpm,
+        }
+        if profiler:
+            process_options['profile_path'] = profile_path
+        if review_store:
+            process_options['review_store_path'] = review_store.path
+            process_options['review_store_run_id'] = review_store.run_id
+        governor = ResourceGovernor(max_workers=num_workers)
+        run_process_pool(language, pending, output_folder, process_options, on_result, wait_policy, selector_registry,
+                         governor, on_harvest if harvest else None, metrics)
+    else:
+        keyword_queue = Queue()
+        for kw in pending:
+            keyword_queue.put(kw)
+
+        # Every worker thread shares one wait policy, image downloader, place cache, selector
+        # registry, review store and metrics registry; each guards its state (and SQLite
+        # connection) with a lock. Worker processes build their own instead (see process_worker),
+        # opening the same SQLite files, and SQLite serialises their writes.
+        image_downloader = ImageDownloader()
+        place_cache = PlaceCache(PlaceCache.path_for(output_folder))
+        scraper_options = {
+            'wait_policy': wait_policy,
+            'lean': lean,
+            'image_downloader': image_downloader,
+            'artifact_policy': ArtifactPolicy(artifacts),
+            'incremental': incremental,
+            'place_cache': place_cache,
+            'save_snapshots': save_snapshots,
+            'review_source': review_source,
+            'selector_registry': selector_registry,
+            'review_store': review_store,
+            'metrics': metrics,
+        }
+
+        def queue_harvest(worker_id, kw, places):
+            for url in on_harvest(worker_id, kw, places):
+                keyword_queue.put(url)
+
+        threads = [None] * num_workers
+
+        for i in range(num_workers):
+            # Harvesting workers stay up until the last harvested place is reported
+            threads[i] = Thread(target=scrape_maps, args=(language, keyword_queue, output_folder, i, on_result,
+                                                           scraper_options, progress.finished,
+                                                           queue_harvest if harvest else None, profiler),
+                                name=f'worker-{i}')
+            threads[i].start()
+
+        for i in range(num_workers):
+            threads[i].join()
+
+        # Browsers are done; let the last image downloads finish
+        image_downloader.close()
+        place_cache.close()
+
+    print(f'----------\nScraped {progress.ok}/{progress.total} keywords successfully')
+    wait_policy.print_summary()
+    selector_registry.print_stats()
+
+    sink.close()
+
+    if export_format:
+        # The journal holds everything scraped so far, including keywords finished before a resume
+        exporter = MapDataExporter('00_output', output_folder, journal.completed_places())
+        try:
+            with metrics.timer('export'):
+                exporter.export(export_format)
+        except Exception as e:
+            # The places are safe in the journal and the stream; keep going with the rest of the run
+            print(f'[ERROR] Export to {export_format} failed: {e}')
+    journal.close()
 
-    exporter = MapDataExporter('00_output.xls', output_folder, all_places)
-    exporter.export_excel()
+    if review_store:
+        review_store.finish_run()
 
     if auto_analyze:
-        session_csv_files = [p.csv_path for p in all_places if hasattr(p, 'csv_path') and p.csv_path]
-        analyze_all_reviews(output_folder, csv_files=session_csv_files)
+        # Places in the review store are analyzed from it; the CSVs cover places without a place id
+        place_ids = []
+        if review_store:
+            place_ids = list(dict.fromkeys(p.place_id for p in session_places if p.csv_path and p.place_id))
+        session_csv_files = [p.csv_path for p in session_places
+                             if hasattr(p, 'csv_path') and p.csv_path and not (review_store and p.place_id)]
+        analyze_all_reviews(output_folder, csv_files=session_csv_files, review_store=review_store,
+                            place_ids=place_ids, metrics=metrics, profiler=profiler)
+
+    if review_store:
+        review_store.close()
+
+    metrics.print_summary()
+    if metrics_format:
+        metrics.write(os.path.join(output_folder, f'metrics_{run_started}.{metrics_format}'))
+    if profiler:
+        profiler.stop()
+        # In process mode this is the parent only (result handling, export, analysis)
+        profiler.write(profile_path)
 
 
 if __name__ == "__main__":
+    # python main.py --profile: sample every worker and write flamegraph profiles to <output>/profiles/
+    profile = '--profile' in sys.argv[1:]
+
     while True:
         language = input('----------\n[1] Enter the language (ES or EN): ')
         if language not in ('ES', 'EN'):
@@ -148,4 +584,73 @@ if __name__ == "__main__":
         else:
             print("----------\n** Error ** Please enter Y or N\n")
 
-    run_google_maps_scraper(language, keywords_file, output_folder, auto_analyze)
+    while True:
+        workers_choice = input(f'----------\n[5] Number of browser workers (default {DEFAULT_WORKERS}): ').strip()
+        if workers_choice == '':
+            num_workers = DEFAULT_WORKERS
+            break
+        elif workers_choice.isdigit() and int(workers_choice) > 0:
+            num_workers = int(workers_choice)
+            break
+        else:
+            print("----------\n** Error ** Please enter a positive number\n")
+
+    while True:
+        lean_choice = input('----------\n[6] Lean mode: headless, no images/fonts/map tiles? (Y/N): ').upper()
+        if lean_choice in ('Y', 'N'):
+            lean = (lean_choice == 'Y')
+            break
+        else:
+            print("----------\n** Error ** Please enter Y or N\n")
+
+    while True:
+        incremental_choice = input('----------\n[7] Only scrape reviews newer than the ones already saved? (Y/N): ').upper()
+        if incremental_choice in ('Y', 'N'):
+            incremental = (incremental_choice == 'Y')
+            break
+        else:
+            print("----------\n** Error ** Please enter Y or N\n")
+
+    while True:
+        mode_choice = input('----------\n[8] Run workers as threads or as processes sized to this machine? (T/P): ').upper()
+        if mode_choice in ('T', 'P'):
+            mode = 'processes' if mode_choice == 'P' else 'threads'
+            break
+        else:
+            print("----------\n** Error ** Please enter T or P\n")
+
+    while True:
+        harvest_choice = input('----------\n[9] For each search: open the First result, harvest the whole List, '
+                               'or harvest the list and scrape every place in Detail? (F/L/D): ').upper()
+        if harvest_choice in ('F', 'L', 'D'):
+            harvest = harvest_choice in ('L', 'D')
+            harvest_details = (harvest_choice == 'D')
+            break
+        else:
+            print("----------\n** Error ** Please enter F, L or D\n")
+
+    export_formats = {'X': 'xlsx', 'C': 'csv', 'P': 'parquet', 'N': None}
+    while True:
+        export_choice = input('----------\n[10] Final export of places and reviews: XLSX, CSV, Parquet or None? '
+                              '(places are always streamed to a .jsonl file) (X/C/P/N): ').upper()
+        if export_choice in export_formats:
+            export_format = export_formats[export_choice]
+            break
+        else:
+            print("----------\n** Error ** Please enter X, C, P or N\n")
+
+    while True:
+        rpm_choice = input('----------\n[11] Max Google Maps requests per minute across all workers '
+                           '(Enter for no limit): ').strip()
+        if rpm_choice == '':
+            rate_limit_rpm = None
+            break
+        elif rpm_choice.isdigit() and int(rpm_choice) > 0:
+            rate_limit_rpm = int(rpm_choice)
+            break
+        else:
+            print("----------\n** Error ** Please enter a positive number\n")
+
+    run_google_maps_scraper(language, keywords_file, output_folder, auto_analyze, num_workers, lean,
+                            incremental=incremental, mode=mode, harvest=harvest, harvest_details=harvest_details,
+                            export_format=export_format, rate_limit_rpm=rate_limit_rpm, profile=profile)
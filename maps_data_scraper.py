@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 
-import random
+import os
 import time
 import re
-import urllib.request
 import csv
+import hashlib
+from urllib.parse import unquote_plus
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from selenium import webdriver
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchElementException, NoSuchWindowException,
+                                        TimeoutException, WebDriverException)
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.keys import Keys
@@ -13,67 +17,259 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from place_maps import MapsPlace
+from debug_artifacts import ArtifactPolicy, ArtifactRecorder
+from image_downloader import ImageDownloader
+from metrics import MetricsRegistry
+from place_cache import PlaceCache, is_place_url
+from place_maps import (REVIEW_FIELDNAMES, MapsPlace, Review, language_config, parse_count, parse_decimal,
+                        review_rows)
+from review_network import NetworkReviewCapture
+from selector_registry import SelectorRegistry
+from wait_policy import WaitPolicy, place_title_changed, place_title_loaded
+
+# Resource patterns dropped in lean mode via Chrome DevTools request blocking
+LEAN_BLOCKED_URLS = [
+    # Fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com/*',
+    # Map tiles, satellite imagery and Street View
+    '*/maps/vt?*', '*/maps/vt/*', '*/kh/v=*', '*khms*.google.com/*', '*streetviewpixels-pa.googleapis.com/*',
+    # Static imagery (icons, sprites, photos served with a file extension)
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+]
+
+# Place photos / thumbnails; only blocked when image download is off
+LEAN_BLOCKED_PHOTO_URLS = ['*googleusercontent.com/*', '*ggpht.com/*']
+
+# Errors that mean the browser session itself is broken or hung, not just the page
+DRIVER_ERRORS = (TimeoutException, InvalidSessionIdException, NoSuchWindowException, ConnectionError,
+                 Urllib3HTTPError)
+DRIVER_ERROR_MESSAGES = ('disconnected', 'not reachable', 'session deleted', 'target window already closed',
+                         'timed out receiving message')
+
+# Finds the scrollable reviews pane. Cheapest first: the selector cached for this
+# session, then the ancestors of the first review, then a bounded scan of the
+# main pane (no textContent, which serializes whole subtrees).
+# Returns [element, selector to cache] or null.
+FIND_SCROLL_CONTAINER_SCRIPT = """
+const cached = arguments[0];
+const reviewSelector = 'div[data-review-id], div.jftiEf, div.MyEned';
+const maxScan = 1500;
+
+const isScrollable = el => {
+    if (el.scrollHeight <= el.clientHeight || el.clientHeight <= 100) return false;
+    const overflow = getComputedStyle(el).overflowY;
+    return overflow === 'auto' || overflow === 'scroll';
+};
+const selectorFor = el => {
+    const classes = Array.from(el.classList).filter(c => /^[A-Za-z][\\w-]*$/.test(c));
+    return classes.length ? 'div.' + classes.join('.') : null;
+};
+
+if (cached) {
+    for (const el of document.querySelectorAll(cached)) {
+        if (isScrollable(el) && el.querySelector(reviewSelector)) return [el, cached];
+    }
+}
+
+const firstReview = document.querySelector(reviewSelector);
+for (let el = firstReview ? firstReview.parentElement : null; el && el !== document.body; el = el.parentElement) {
+    if (isScrollable(el)) return [el, selectorFor(el)];
+}
+
+const root = document.querySelector('div[role="main"]') || document.body;
+const divs = root.getElementsByTagName('div');
+let best = null;
+for (let i = 0; i < divs.length && i < maxScan; i++) {
+    const div = divs[i];
+    if (isScrollable(div) && div.querySelector('span[role="img"], ' + reviewSelector)) {
+        if (!best || div.scrollHeight > best.scrollHeight) best = div;
+    }
+}
+return best ? [best, selectorFor(best)] : null;
+"""
+
+# Columns of the review CSVs (scraped records carry all but published, which is derived from date)
+
+# Expands all truncated reviews first (clicks are synchronous), then returns one
+# record per review element so the whole extraction is a single WebDriver call.
+EXTRACT_REVIEWS_SCRIPT = """
+const elements = arguments[0];
+const moreSelector = 'button[aria-label*="See more"], button[aria-label*="Ver más"]';
+for (const el of elements) {
+    for (const btn of el.querySelectorAll(moreSelector)) {
+        try { btn.click(); } catch (e) {}
+    }
+}
+const text = (el, selector) => {
+    const node = el.querySelector(selector);
+    return node ? node.innerText.trim() : '';
+};
+return elements.map(el => {
+    const idNode = el.hasAttribute('data-review-id') ? el : el.querySelector('[data-review-id]');
+    const ratingNode = el.querySelector('span[role="img"]');
+    const ratingLabel = ratingNode ? (ratingNode.getAttribute('aria-label') || '').trim() : '';
+    return {
+        review_id: idNode ? idNode.getAttribute('data-review-id') : '',
+        reviewer_name: text(el, 'div.d4r55'),
+        rating: ratingLabel ? ratingLabel.split(/\\s+/)[0] : '',
+        date: text(el, 'span.rsqaWe'),
+        review_text: text(el, 'span.wiI7pd')
+    };
+});
+"""
+
+# Scrolls the search results feed; done once Google shows the end-of-list marker.
+SCROLL_RESULTS_SCRIPT = """
+const feed = arguments[0];
+feed.scrollTop = feed.scrollHeight;
+return [feed.querySelectorAll('div[role="article"]').length, !!feed.querySelector('span.HlvSq')];
+"""
+
+# Summary fields of every result card in the feed, read in a single WebDriver call.
+HARVEST_RESULTS_SCRIPT = """
+const cards = Array.from(arguments[0].querySelectorAll('div[role="article"]')).slice(0, arguments[1]);
+const text = (el, selector) => {
+    const node = el.querySelector(selector);
+    return node ? node.innerText.trim() : '';
+};
+return cards.map(card => {
+    const link = card.querySelector('a.hfpxzc, a[href*="/maps/place/"]');
+    const row = card.querySelector('div.W4Efsd > div.W4Efsd');
+    const categoryNode = row ? (row.querySelector('span > span') || row) : null;
+    return {
+        name: card.getAttribute('aria-label') || text(card, 'div.qBF1Pd'),
+        stars: text(card, 'span.MW4etd'),
+        reviews: text(card, 'span.UY7F9').replace(/[()]/g, ''),
+        category: categoryNode ? categoryNode.innerText.split('\u00b7')[0].trim() : '',
+        url: link ? link.href : ''
+    };
+});
+"""
 
 
 class GoogleMapsDataScraper:
 
-    def __init__(self, language, img_output):
+    def __init__(self, language, img_output, wait_policy=None, lean=False, download_images=True,
+                 image_downloader=None, artifact_policy=None, worker_id=0, incremental=False, place_cache=None,
+                 save_snapshots=False, review_source='dom', selector_registry=None, review_store=None,
+                 metrics=None):
+        """
+        Args:
+            language: 'ES' or 'EN', must match the Google Maps interface.
+            img_output: Folder where images and review CSVs are written.
+            wait_policy: Optional shared WaitPolicy; a default one is created otherwise.
+            lean: Run headless and block fonts, map tiles and imagery we never read.
+            download_images: Save each place's cover image (thumbnails stay unblocked in lean mode).
+            image_downloader: Optional shared ImageDownloader; one is created on demand otherwise.
+            artifact_policy: When to capture debug screenshots/page sources (default: on failure only).
+            worker_id: Worker number, used to keep debug artifact paths unique.
+            incremental: Only scrape reviews newer than the ones already in the place's CSV.
+            place_cache: Optional shared PlaceCache for direct place navigation and in-run merging.
+            save_snapshots: Keep the place and reviews HTML in snapshots/ for offline re-extraction.
+            review_source: 'dom' reads rendered reviews; 'network' decodes the review XHR responses
+                and falls back to the DOM if none were captured.
+            selector_registry: Optional shared SelectorRegistry; a private one is created otherwise.
+            review_store: Optional ReviewStore; every place and its reviews are bulk inserted into it
+                (the review CSVs are still written).
+            metrics: Optional shared MetricsRegistry for per-phase timings and counters.
+        """
         self.driver = None
         self.error_count = 0
+        self.driver_error = False
         self.img_output = img_output
-        self.config = self._setup_config(language)
-
-    def _setup_config(self, language):
-        config = {
-            'language': '--lang=es-ES',
-            'stars_text': 'estrellas',
-            'reviews_text': 'reseñas',
-            'address_text': 'Dirección: ',
-            'website_text': 'Sitio web: ',
-            'phone_text': 'Teléfono: ',
-            'pluscode_text': 'Plus Code: ',
-            'hours_text': 'Ocultar el horario de la semana',
-            'hours_replace': [' Ocultar el horario de la semana', 'El horario podría cambiar', '; '],
-            'sort_text': 'Ordenar',
-            'newest_text': 'Más recientes'
-        }
-        if language == 'EN':
-            config['language'] = '--lang=en-GB'
-            config['stars_text'] = 'stars'
-            config['reviews_text'] = 'reviews'
-            config['address_text'] = 'Address: '
-            config['website_text'] = 'Website: '
-            config['phone_text'] = 'Phone: '
-            config['pluscode_text'] = 'Plus code: '
-            config['hours_text'] = 'Hide open hours for the week'
-            config['hours_replace'] = ['. Hide open hours for the week', 'Hours might differ', '; ']
-            config['sort_text'] = 'Sort'
-            config['newest_text'] = 'Newest'
-
-        return config
+        self.language = language
+        self.config = language_config(language)
+        self.selectors = (selector_registry or SelectorRegistry()).for_language(language, self.config)
+        self.wait = wait_policy or WaitPolicy()
+        self.lean = lean
+        self.download_images = download_images
+        self.image_downloader = image_downloader
+        self.owns_image_downloader = False
+        self.incremental = incremental
+        self.place_cache = place_cache
+        self.save_snapshots = save_snapshots
+        self.review_source = review_source
+        self.review_store = review_store
+        self.metrics = metrics or MetricsRegistry()
+        self.network_capture = None
+        self.scroll_container_selector = None
+        self.artifacts = ArtifactRecorder(artifact_policy or ArtifactPolicy(), img_output, worker_id)
 
     def init_driver(self):
+        start = time.perf_counter()
         try:
             chrome_options = webdriver.ChromeOptions()
-            #chrome_options.add_argument('--headless')
+            if self.lean:
+                chrome_options.add_argument('--headless=new')
+                # Headless defaults to a small viewport, which changes the Maps layout
+                chrome_options.add_argument('--window-size=1920,1080')
+                chrome_options.add_argument('--disable-extensions')
+                chrome_options.add_argument('--mute-audio')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--log-level=3')
             chrome_options.add_argument(self.config['language'])
+            if self.review_source == 'network':
+                chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
             s = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=s, options=chrome_options)
-            self.driver.get('https://www.google.com/maps/')
-            time.sleep(5)
-            self.dismiss_popups()
+            # Turn hung page loads and scripts into exceptions instead of blocking the worker
+            self.driver.set_page_load_timeout(self.wait.timeouts['page_load'])
+            self.driver.set_script_timeout(self.wait.timeouts['script'])
+            if self.lean:
+                self.block_resources()
+            if self.review_source == 'network':
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.network_capture = NetworkReviewCapture(self.driver)
+            self.open_home()
             print("Page title:", self.driver.title)
             print("Current URL:", self.driver.current_url)
+            self.metrics.observe('init_driver', time.perf_counter() - start)
             return True
         except Exception as e:
             print(e)
             print('Error with the Chrome Driver')
+            self.metrics.inc('driver_start_failures')
             return False
 
+    def restart_driver(self):
+        """Quit the current (possibly hung) Chrome session and start a fresh one."""
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"[DEBUG] Error quitting driver: {e}")
+        self.error_count = 0
+        self.driver_error = False
+        self.scroll_container_selector = None
+        return self.init_driver()
+
+    def is_driver_error(self, e):
+        """True if e means the browser session is broken or hung rather than the page being unexpected."""
+        if isinstance(e, DRIVER_ERRORS):
+            return True
+        message = str(e).lower()
+        return isinstance(e, WebDriverException) and any(m in message for m in DRIVER_ERROR_MESSAGES)
+
+    def block_resources(self):
+        """Drop resource types we never read using DevTools request blocking."""
+        blocked = list(LEAN_BLOCKED_URLS)
+        if not self.download_images:
+            blocked += LEAN_BLOCKED_PHOTO_URLS
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+            print(f"[DEBUG] Lean mode: blocking {len(blocked)} URL patterns")
+        except Exception as e:
+            print(f"[DEBUG] Could not enable request blocking: {e}")
+
+    def open_home(self):
+        """Load the Maps home page and wait until the search box is usable."""
+        self.wait.acquire()
+        self.driver.get('https://www.google.com/maps/')
+        self.dismiss_popups()
+        self.wait.until_or_none(self.driver, 'home',
+                                EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[name="q"]')))
+
     def dismiss_popups(self):
         """Dismiss any popups that might be blocking the search box."""
         try:
@@ -84,7 +280,6 @@ class GoogleMapsDataScraper:
             pass
         try:
             self.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-            time.sleep(0.5)
         except:
             pass
 
@@ -94,78 +289,278 @@ class GoogleMapsDataScraper:
             s = s.replace(a, b).replace(a.upper(), b.upper())
         return s
 
-    def scrape_place(self, kw):
+    def save_snapshot(self, kw, kind):
+        """
+        Write the current page source to snapshots/<keyword>.<kind>.html so it can be
+        re-extracted offline (see offline_extractor.py). The keyword is kept in a comment.
+        """
+        if not self.save_snapshots:
+            return
         try:
-            place = MapsPlace()
-            place.keyword = kw
-            if self.error_count == 5:
-                self.error_count = 0
-                time.sleep(1)
-                self.driver.get('https://www.google.com/maps/')
-                time.sleep(3)
-                self.dismiss_popups()
+            snapshot_dir = os.path.join(self.img_output, 'snapshots')
+            os.makedirs(snapshot_dir, exist_ok=True)
+            path = os.path.join(snapshot_dir, f'{self.keyword_filename(kw)}.{kind}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f'<!-- keyword: {kw} -->\n')
+                f.write(self.driver.page_source)
+            print(f"[DEBUG] Saved {kind} snapshot to: {path}")
+        except Exception as e:
+            print(f"[DEBUG] Failed to save {kind} snapshot: {e}")
+
+    def keyword_filename(self, kw):
+        """Filesystem-safe base name derived from a keyword (or, for a place URL, from the place name in it)."""
+        if is_place_url(kw):
+            place_path = kw.split('/maps/place/')[1].split('/')[0]
+            place_key = PlaceCache.place_id_from_url(kw) or kw
+            kw = f"{unquote_plus(place_path)} {hashlib.sha1(place_key.encode('utf-8')).hexdigest()[:8]}"
+        filename = kw.lower()
+        filename = self.remove_accents(filename)
+        filename = re.sub(r'[^\w\s-]', '', filename)
+        filename = filename.replace(' ', '-')
+        filename = re.sub(r'-+', '-', filename)
+        return filename
+
+    def queue_image(self, kw):
+        """Hand the place cover image to the background downloader; never blocks on HTTP."""
+        img_src = self.driver.find_element(By.XPATH, '//img[@decoding="async"]').get_attribute("src")
+        if not img_src or 'gstatic' in img_src or 'streetviewpixels' in img_src:
+            print("[DEBUG] No place photo (icon or Street View placeholder)")
+            return
+
+        if self.image_downloader is None:
+            self.image_downloader = ImageDownloader()
+            self.owns_image_downloader = True
+
+        full_path = f"{self.img_output}{self.keyword_filename(kw)}.jpg"
+        if self.image_downloader.submit(img_src, full_path):
+            print(f"[DEBUG] Image queued: {full_path}")
+
+    def submit_search(self, kw):
+        """Type kw in the search box and wait for a results list or a single place page. Returns False on failure."""
+        try:
+            input_box = self.wait.until(
+                self.driver, 'search_box',
+                EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[name="q"]'))
+            )
+            print("[DEBUG] Found search box")
+        except Exception as e:
+            print(f"[DEBUG] Failed to find search box: {e}")
+            # A dead or hung session usually shows up here first; let the worker requeue the keyword
+            self.driver_error = self.is_driver_error(e)
+            self.artifacts.failure(self.driver, 'search_box', e)
+            return False
 
-            time.sleep(random.randint(1, 3))
-            self.dismiss_popups()
-            time.sleep(1)
+        input_box.click()
+        input_box.clear()
+        input_box.send_keys(kw)
+        print(f"[DEBUG] Typed keyword: {kw}")
+        url_before = self.driver.current_url
+        # The previous page's title and results stay in the DOM until the new ones replace them
+        title_before = place_title_loaded(self.driver) or None
+        articles_before = self.driver.find_elements(By.CSS_SELECTOR, 'div[role="article"]')
+        results_loaded = EC.presence_of_element_located((By.CSS_SELECTOR, 'div[role="article"]'))
+        if articles_before:
+            results_loaded = EC.all_of(EC.staleness_of(articles_before[0]), results_loaded)
+        self.wait.acquire()
+        input_box.send_keys(Keys.ENTER)
+        print("[DEBUG] Pressed Enter")
+
+        # Wait for the new search to land: either a new results list or a new place page
+        landed = self.wait.until_or_none(self.driver, 'search_results', EC.all_of(
+            EC.url_changes(url_before),
+            EC.any_of(results_loaded, place_title_changed(title_before)),
+        ))
+        if landed is None:
+            # Whatever is on screen still belongs to the previous place or search
+            print("[DEBUG] Search did not load a new results list or place")
+            self.artifacts.failure(self.driver, 'search_results', 'no new results list or place after search')
+            return False
 
-            # --- SEARCH ---
+        self.artifacts.snapshot(self.driver, 'after_search')
+        print(f"[DEBUG] URL after search: {self.driver.current_url}")
+        return True
+
+    def search_place(self, kw, place):
+        """Search for kw and open the first result. Fills place.name; returns False if nothing opened."""
+        if not self.submit_search(kw):
+            return False
+
+        # --- CHECK IF RESULTS LOADED ---
+        results = self.driver.find_elements(By.CSS_SELECTOR, 'div[role="article"]')
+        print(f"[DEBUG] Found {len(results)} results")
+
+        if len(results) == 0:
+            # No results list — maybe it opened a single place directly
             try:
-                input_box = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, 'input[name="q"]'))
-                )
-                print("[DEBUG] Found search box")
+                titles = self.driver.find_elements(By.TAG_NAME, 'h1')
+                for t in titles:
+                    if t.text.strip() != '' and t.text.strip() != 'Results':
+                        place.name = t.text.strip()
+                        print(f"[DEBUG] Single place opened: {place.name}")
+                        break
+                else:
+                    print("[DEBUG] No results and no place title found")
+                    self.artifacts.failure(self.driver, 'search_results', 'no results and no place title')
+                    return False
             except Exception as e:
-                print(f"[DEBUG] Failed to find search box: {e}")
-                return None
+                print("[DEBUG] No results found at all")
+                self.driver_error = self.is_driver_error(e)
+                self.artifacts.failure(self.driver, 'search_results', e)
+                return False
+        else:
+            # Get the place name from the aria-label of the first result
+            place.name = results[0].get_attribute('aria-label')
+            print(f"[DEBUG] Clicking first result: {place.name}")
+            title_before = place_title_loaded(self.driver) or None
+            results[0].click()
+            self.wait.until_or_none(self.driver, 'place_details', EC.all_of(
+                EC.url_contains('/maps/place/'),
+                place_title_changed(title_before),
+            ))
+            self.artifacts.snapshot(self.driver, 'after_click')
 
-            input_box.click()
-            time.sleep(0.5)
-            input_box.clear()
-            time.sleep(0.3)
-            input_box.send_keys(kw)
-            print(f"[DEBUG] Typed keyword: {kw}")
-            time.sleep(1)
-            input_box.send_keys(Keys.ENTER)
-            print("[DEBUG] Pressed Enter")
-            time.sleep(5)
+        return True
 
-            self.driver.save_screenshot('debug_after_search.png')
-            print(f"[DEBUG] URL after search: {self.driver.current_url}")
+    def harvest_results(self, kw, max_results=120):
+        """
+        Search kw once and read the summary of every result card (name, stars,
+        reviews, category, url) after scrolling the results feed, instead of
+        running one search per place. Returns a list of MapsPlace (a search that
+        opens a single place yields just that place), or None if the search failed.
+        """
+        try:
+            self.driver_error = False
+            self.artifacts.begin(self.keyword_filename(kw))
+            if self.error_count == 5:
+                self.error_count = 0
+                self.open_home()
 
-            # --- CHECK IF RESULTS LOADED ---
-            results = self.driver.find_elements(By.CSS_SELECTOR, 'div[role="article"]')
-            print(f"[DEBUG] Found {len(results)} results")
+            self.wait.polite_pause()
+            self.dismiss_popups()
+            with self.metrics.timer('search'):
+                searched = self.submit_search(kw)
+            if not searched:
+                return None
 
-            if len(results) == 0:
-                # No results list — maybe it opened a single place directly
-                try:
-                    titles = self.driver.find_elements(By.TAG_NAME, 'h1')
-                    for t in titles:
-                        if t.text.strip() != '' and t.text.strip() != 'Results':
-                            place.name = t.text.strip()
-                            print(f"[DEBUG] Single place opened: {place.name}")
-                            break
-                    else:
-                        print("[DEBUG] No results and no place title found")
-                        return None
-                except:
-                    print("[DEBUG] No results found at all")
+            try:
+                feed = self.driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
+            except NoSuchElementException:
+                title = place_title_loaded(self.driver)
+                if not title:
+                    print("[DEBUG] No results feed and no place title found")
+                    self.artifacts.failure(self.driver, 'harvest_results', 'no results feed and no place title')
                     return None
+                place = MapsPlace()
+                place.keyword = kw
+                place.name = title.text.strip()
+                place.url = self.driver.current_url
+                place.place_id = PlaceCache.place_id_from_url(place.url)
+                print(f"[DEBUG] Single place opened: {place.name}")
+                return [place]
+
+            loaded = self.scroll_until('scroll_results', feed, max_results, SCROLL_RESULTS_SCRIPT)
+            print(f"[DEBUG] Results feed scrolled, {loaded} results loaded")
+            self.artifacts.snapshot(self.driver, 'after_harvest_scroll')
+
+            places = []
+            seen_ids = set()
+            for record in self.driver.execute_script(HARVEST_RESULTS_SCRIPT, feed, max_results) or []:
+                place = MapsPlace()
+                place.keyword = kw
+                place.name = record.get('name') or ''
+                place.stars = parse_decimal(self.check_rating(record.get('stars') or ''), self.language)
+                place.reviews = parse_count(self.check_rating(record.get('reviews') or ''), self.language)
+                place.category = record.get('category') or ''
+                place.url = record.get('url') or ''
+                place.place_id = PlaceCache.place_id_from_url(place.url)
+                # Sponsored cards repeat organic ones; cards without a place link are not places
+                if not place.place_id or place.place_id in seen_ids:
+                    continue
+                seen_ids.add(place.place_id)
+                places.append(place)
+
+            if self.review_store:
+                for place in places:
+                    self.review_store.add_place(place)
+            self.metrics.inc('places_harvested', len(places))
+            print(f"[DEBUG] Harvested {len(places)} places for: {kw}")
+            return places
+        except Exception as e:
+            print(f"[DEBUG] Error in harvest_results: {e}")
+            self.error_count += 1
+            self.driver_error = self.is_driver_error(e)
+            self.artifacts.failure(self.driver, 'harvest_results', e)
+            return None
+        finally:
+            self.artifacts.end()
+
+    def open_place_url(self, url, place):
+        """Open a known place page directly, skipping the search. Returns False if it did not load."""
+        self.wait.acquire()
+        self.driver.get(url)
+        title = self.wait.until_or_none(self.driver, 'place_details', place_title_loaded)
+        if not title:
+            return False
+        place.name = title.text.strip()
+        self.artifacts.snapshot(self.driver, 'open_place_url')
+        return True
+
+    def scrape_place(self, kw):
+        try:
+            place = MapsPlace()
+            place.keyword = kw
+            self.driver_error = False
+            self.artifacts.begin(self.keyword_filename(kw))
+            if self.error_count == 5:
+                self.error_count = 0
+                self.open_home()
+
+            if is_place_url(kw):
+                # Harvested places are queued by URL: open them directly, never search
+                cached = (kw, PlaceCache.place_id_from_url(kw))
             else:
-                # Get the place name from the aria-label of the first result
-                place.name = results[0].get_attribute('aria-label')
-                print(f"[DEBUG] Clicking first result: {place.name}")
-                results[0].click()
-                time.sleep(3)
-                self.driver.save_screenshot('debug_after_click.png')
+                cached = self.place_cache.lookup(kw) if self.place_cache else None
+            if cached and self.place_cache:
+                merged = self.place_cache.merged(cached[1], kw)
+                if merged is not None:
+                    print(f"[DEBUG] '{kw}' resolves to already scraped place: {merged.name}")
+                    return merged
+
+            self.wait.polite_pause()
+            self.dismiss_popups()
 
-            time.sleep(1)
+            opened = False
+            if cached:
+                with self.metrics.timer('open_place_url'):
+                    opened = self.open_place_url(cached[0], place)
+            if opened:
+                print(f"[DEBUG] Opened place directly: {place.name}")
+            elif is_place_url(kw):
+                self.artifacts.failure(self.driver, 'open_place_url', 'place page did not load')
+                return None
+            else:
+                if cached:
+                    self.place_cache.forget(kw)
+                with self.metrics.timer('search'):
+                    found = self.search_place(kw, place)
+                if not found:
+                    return None
+
+            place.url = self.driver.current_url
+            place.place_id = PlaceCache.place_id_from_url(place.url)
+            if self.place_cache and place.place_id:
+                if not is_place_url(kw):
+                    self.place_cache.store(kw, place.url, place.place_id)
+                merged = self.place_cache.merged(place.place_id, kw)
+                if merged is not None:
+                    print(f"[DEBUG] '{kw}' resolves to already scraped place: {merged.name}")
+                    return merged
 
             # Stars and reviews
+            details_start = time.perf_counter()
             try:
-                val = WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.XPATH, '//*[contains(@aria-label, "' +
-                                                                                          self.config['stars_text'] + '") and @role="img"]')))
+                val = self.wait.until(self.driver, 'rating',
+                                      EC.presence_of_element_located(self.selectors.locator('rating')))
                 if '(' in val.text and ')' in val.text:
                     parts = val.text.replace(')', '').split('(')
                     stars = parts[0]
@@ -174,77 +569,81 @@ class GoogleMapsDataScraper:
                     ratings_label = val.get_attribute("aria-label")
                     stars = ratings_label.replace(self.config['stars_text'], '').replace(' ', '')
 
-                    val = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['reviews_text'] + '")]')
+                    val = self.selectors.find_element(self.driver, 'review_count')
                     ratings_label = val.get_attribute("aria-label")
                     num_reviews = ratings_label.replace(self.config['reviews_text'], '').replace(' ', '')
 
-                place.stars = self.check_rating(stars)
-                place.reviews = self.check_rating(num_reviews)
+                place.stars = parse_decimal(self.check_rating(stars), self.language)
+                place.reviews = parse_count(self.check_rating(num_reviews), self.language)
                 print(f"[DEBUG] Stars: {place.stars}, Reviews: {place.reviews}")
             except Exception as e:
                 print(f"[DEBUG] Could not get stars/reviews: {e}")
 
             # Image
-            try:
-                img_src = self.driver.find_element(By.XPATH, '//img[@decoding="async"]').get_attribute("src")
-                if not 'gstatic' in img_src or not 'streetviewpixels' in img_src:
-                    filename = kw.lower()
-                    filename = self.remove_accents(filename)
-                    filename = re.sub(r'[^\w\s-]', '', filename)
-                    filename = filename.replace(' ', '-')
-                    filename = re.sub(r'-+', '-', filename)
-                    full_path = f"{self.img_output}{filename}.jpg"
-                    urllib.request.urlretrieve(img_src, full_path)
-                    print(f"[DEBUG] Image saved: {full_path}")
-            except Exception as e:
-                print(f"[DEBUG] Unable to obtain the image: {e}")
+            if self.download_images:
+                try:
+                    self.queue_image(kw)
+                except Exception as e:
+                    print(f"[DEBUG] Unable to obtain the image: {e}")
 
             # Category
             try:
-                place.category = self.find_by_xpath('//button[contains(@jsaction, "pane.") and contains(@jsaction, ".category")]')
+                place.category = self.selectors.find_element(self.driver, 'category').text
             except:
                 place.category = ''
 
             # Address
             try:
-                address_label = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['address_text'] + '")]').get_attribute('aria-label')
+                address_label = self.selectors.find_element(self.driver, 'address').get_attribute('aria-label')
                 place.address = address_label.replace(self.config['address_text'], "").strip()
             except:
                 place.address = ''
 
             # Website
             try:
-                web_label = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['website_text'] + '")]').get_attribute('aria-label')
+                web_label = self.selectors.find_element(self.driver, 'website').get_attribute('aria-label')
                 place.web = web_label.replace(self.config['website_text'], "").strip()
             except:
                 place.web = ''
 
             # Phone
             try:
-                phone_label = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['phone_text'] + '")]').get_attribute('aria-label')
+                phone_label = self.selectors.find_element(self.driver, 'phone').get_attribute('aria-label')
                 place.phone = phone_label.replace(self.config['phone_text'], "").strip()
             except:
                 place.phone = ''
 
             # Plus Code
             try:
-                pluscode_label = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['pluscode_text'] + '")]').get_attribute('aria-label')
+                pluscode_label = self.selectors.find_element(self.driver, 'pluscode').get_attribute('aria-label')
                 place.pluscode = pluscode_label.replace(self.config['pluscode_text'], "").strip()
             except:
                 place.pluscode = ''
 
             place.hours = self.get_hours()
+            self.metrics.observe('place_details', time.perf_counter() - details_start)
 
             print(f"[DEBUG] Scrape complete for: {place.name}")
+            self.save_snapshot(kw, 'place')
+            if self.review_store:
+                self.review_store.add_place(place)
 
             # Scrape reviews
-            place.csv_path = self.scrape_reviews(kw, num_reviews=200)
+            place.csv_path = self.scrape_reviews(kw, num_reviews=200, place=place)
 
+            if self.place_cache:
+                self.place_cache.register(place)
+            self.metrics.inc('places_scraped')
             return place
         except Exception as e:
             print(f"[DEBUG] Error in scrape_place: {e}")
+            self.metrics.inc('places_failed')
             self.error_count += 1
+            self.driver_error = self.is_driver_error(e)
+            self.artifacts.failure(self.driver, 'scrape_place', e)
             return None
+        finally:
+            self.artifacts.end()
 
     def find_by_xpath(self, xpath):
         try:
@@ -261,7 +660,7 @@ class GoogleMapsDataScraper:
 
     def get_hours(self):
         try:
-            hours = self.driver.find_element(By.XPATH, '//*[contains(@aria-label, "' + self.config['hours_text'] + '")]').get_attribute('aria-label')
+            hours = self.selectors.find_element(self.driver, 'hours').get_attribute('aria-label')
             hours = hours.replace(self.config['hours_replace'][0], '')
             hours = hours.replace(self.config['hours_replace'][1], '')
             hours = hours.replace(self.config['hours_replace'][2], '\n')
@@ -279,121 +678,95 @@ class GoogleMapsDataScraper:
         else:
             return val
 
-    def scrape_reviews(self, kw, num_reviews=200):
+    def scrape_reviews(self, kw, num_reviews=200, place=None):
         """
-        Scrape reviews for the current place and save to CSV.
-        Must be called after scrape_place() has already opened a place.
+        Scrape reviews for the current place and save to CSV (and, given the place,
+        to the review store). Must be called after scrape_place() has already opened a place.
         """
         try:
             reviews_data = []
+            csv_path = f"{self.img_output}{self.keyword_filename(kw)}_reviews.csv"
+            known_reviews = self.load_known_reviews(csv_path) if self.incremental else []
+            known_ids = {r.review_id for r in known_reviews if r.review_id}
+            if self.incremental and self.review_store and place is not None and place.place_id:
+                known_ids |= self.review_store.review_ids(place.place_id)
+            sorted_newest = False
+            if self.network_capture is not None:
+                # Start from an empty performance log for this place
+                self.network_capture.reset()
 
             # Click on the Reviews tab
+            tab_start = time.perf_counter()
             try:
-                reviews_button = WebDriverWait(self.driver, 5).until(
+                reviews_button = self.wait.until(
+                    self.driver, 'reviews_tab',
                     EC.element_to_be_clickable((By.XPATH, '//button[@role="tab" and contains(@aria-label, "Reviews")]'))
                 )
                 reviews_button.click()
                 print("[DEBUG] Clicked Reviews tab")
-                time.sleep(2)
 
                 # Sort by Newest
                 try:
                     print("[DEBUG] Attempting to sort by Newest...")
-                    sort_button = WebDriverWait(self.driver, 5).until(
+                    sort_button = self.wait.until(
+                        self.driver, 'sort_menu',
                         EC.element_to_be_clickable((By.XPATH, f'//button[.//span[text()="{self.config["sort_text"]}"]] | //span[contains(@class, "GMtm7c") and text()="{self.config["sort_text"]}"]/ancestor::button'))
                     )
                     sort_button.click()
-                    time.sleep(1)
 
-                    newest_option = WebDriverWait(self.driver, 5).until(
+                    newest_option = self.wait.until(
+                        self.driver, 'sort_menu',
                         EC.element_to_be_clickable((By.XPATH, f'//div[@role="menuitemradio" and .//div[text()="{self.config["newest_text"]}"]] | //div[text()="{self.config["newest_text"]}"] | //button[.//div[text()="{self.config["newest_text"]}"]]'))
                     )
+                    if self.network_capture is not None:
+                        # Drop the responses for the default order before the newest-first page can arrive
+                        self.network_capture.reset()
                     newest_option.click()
                     print(f"[DEBUG] Sorted by {self.config['newest_text']}")
-                    time.sleep(2)
+                    sorted_newest = True
                 except Exception as e:
                     print(f"[DEBUG] Could not sort by Newest: {e}")
 
                 # Wait for reviews to load
                 try:
-                    WebDriverWait(self.driver, 10).until(
+                    self.wait.until(
+                        self.driver, 'reviews',
                         EC.presence_of_element_located((By.CSS_SELECTOR, 'div.jftiEf, div[data-review-id], div.MyEned'))
                     )
                     print("[DEBUG] Reviews loaded")
                 except:
                     print("[DEBUG] Reviews taking long to load, continuing anyway...")
 
-                time.sleep(2)
-
             except Exception as e:
                 print(f"[DEBUG] Could not click Reviews tab: {e}")
+                self.artifacts.failure(self.driver, 'reviews_tab', e)
                 return None
+            self.metrics.observe('reviews_tab', time.perf_counter() - tab_start)
+
+            # Stopping at the first known review is only valid when the list is newest-first
+            if known_ids and not sorted_newest:
+                print("[DEBUG] Reviews not sorted by newest, scraping without the known-review stop")
+            stop_ids = known_ids if sorted_newest else set()
 
             # Scroll to load more reviews using dynamic container detection
             scrollable_div = None
 
-            # Save page source for debugging
-            try:
-                debug_html_path = f'{self.img_output}page_source_reviews.html'
-                with open(debug_html_path, 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
-                print(f"[DEBUG] Saved page source to: {debug_html_path}")
-            except Exception as e:
-                print(f"[DEBUG] Failed to save page source: {e}")
-
-            try:
-                debug_screenshot_path = f'{self.img_output}debug_reviews_tab.png'
-                self.driver.save_screenshot(debug_screenshot_path)
-                print(f"[DEBUG] Saved screenshot to: {debug_screenshot_path}")
-            except Exception as e:
-                print(f"[DEBUG] Failed to save screenshot: {e}")
+            self.artifacts.snapshot(self.driver, 'reviews_tab')
 
             # Use JavaScript to find the scrollable container dynamically
             try:
                 print("[DEBUG] Using JavaScript to find scrollable container...")
 
-                find_scrollable_script = """
-                function findScrollableReviewsContainer() {
-                    const allDivs = document.querySelectorAll('div');
-                    const scrollableDivs = [];
-
-                    for (let div of allDivs) {
-                        if (div.scrollHeight > div.clientHeight && div.clientHeight > 100) {
-                            const hasReviewContent = div.querySelector('span[role="img"]') !== null ||
-                                                    div.textContent.includes('star') ||
-                                                    div.querySelector('div.jftiEf') !== null ||
-                                                    div.querySelector('div[data-review-id]') !== null;
-
-                            if (hasReviewContent) {
-                                scrollableDivs.push({
-                                    element: div,
-                                    scrollHeight: div.scrollHeight,
-                                    clientHeight: div.clientHeight,
-                                    className: div.className
-                                });
-                            }
-                        }
-                    }
-
-                    scrollableDivs.sort((a, b) => b.scrollHeight - a.scrollHeight);
-                    return scrollableDivs.length > 0 ? scrollableDivs[0].element : null;
-                }
-
-                return findScrollableReviewsContainer();
-                """
-
-                scrollable_div = self.driver.execute_script(find_scrollable_script)
+                scrollable_div, selector = self.driver.execute_script(
+                    FIND_SCROLL_CONTAINER_SCRIPT, self.scroll_container_selector) or (None, None)
+                if selector and selector != self.scroll_container_selector:
+                    print(f"[DEBUG] Caching scroll container selector: {selector}")
+                    self.scroll_container_selector = selector
 
                 if scrollable_div:
                     print("[DEBUG] Found scrollable container via JavaScript")
-
-                    for i in range(40):
-                        self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
-                        time.sleep(0.5)
-                        if (i + 1) % 5 == 0:
-                            print(f"[DEBUG] Scrolled {i+1}/40 times")
-
-                    print("[DEBUG] JavaScript scrolling complete")
+                    loaded = self.scroll_reviews(scrollable_div, num_reviews, stop_ids)
+                    print(f"[DEBUG] JavaScript scrolling complete, {loaded} reviews loaded")
                 else:
                     print("[DEBUG] No scrollable container found via JavaScript")
 
@@ -435,9 +808,7 @@ class GoogleMapsDataScraper:
 
                         for candidate in scrollable_candidates:
                             try:
-                                for i in range(10):
-                                    self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', candidate)
-                                    time.sleep(0.5)
+                                self.scroll_reviews(candidate, num_reviews, stop_ids)
                                 print("[DEBUG] Hardcoded selector scrolling complete")
                                 break
                             except:
@@ -445,133 +816,60 @@ class GoogleMapsDataScraper:
                     except Exception as e3:
                         print(f"[DEBUG] All scrolling methods failed: {e3}")
 
-            # Save screenshot after scrolling
-            try:
-                self.driver.save_screenshot(f'{self.img_output}debug_after_scrolling.png')
-                print("[DEBUG] Saved screenshot after scrolling")
-            except:
-                pass
-
-            # Try multiple selectors to find reviews
-            review_elements = []
-
-            # Method 1: jftiEf class (common review wrapper)
-            review_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div.jftiEf')
-            if len(review_elements) > 0:
-                print(f"[DEBUG] Found {len(review_elements)} reviews using jftiEf class")
-
-            # Method 2: data-review-id attribute
-            if len(review_elements) == 0:
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div[data-review-id]')
-                if len(review_elements) > 0:
-                    print(f"[DEBUG] Found {len(review_elements)} reviews using data-review-id")
-
-            # Method 3: MyEned class (another review container)
-            if len(review_elements) == 0:
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div.MyEned')
-                if len(review_elements) > 0:
-                    print(f"[DEBUG] Found {len(review_elements)} reviews using MyEned class")
-
-            # Method 4: WNxzHc class
-            if len(review_elements) == 0:
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div.WNxzHc')
-                if len(review_elements) > 0:
-                    print(f"[DEBUG] Found {len(review_elements)} reviews using WNxzHc class")
-
-            # Method 5: XPath pattern
-            if len(review_elements) == 0:
-                review_elements = self.driver.find_elements(By.XPATH, '//div[contains(@class, "fontBodyMedium") and .//span[@role="img"]]')
-                if len(review_elements) > 0:
-                    print(f"[DEBUG] Found {len(review_elements)} reviews using XPath pattern")
-
-            if len(review_elements) == 0:
-                print("[DEBUG] Could not find any reviews with any selector")
-                with open(f'{self.img_output}debug_no_reviews.html', 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
-                print("[DEBUG] Saved debug_no_reviews.html for inspection")
-                return None
-
-            seen_reviews = set()  # Track unique reviews by reviewer name + date
-
-            for idx, review_elem in enumerate(review_elements[:num_reviews * 2]):
-                if len(reviews_data) >= num_reviews:
-                    break
-
-                try:
-                    # Expand truncated reviews
-                    try:
-                        more_button = review_elem.find_element(By.CSS_SELECTOR, 'button[aria-label*="See more"]')
-                        more_button.click()
-                        time.sleep(0.3)
-                    except:
-                        pass
-
-                    # Extract review data
-                    reviewer_name = ""
-                    rating = ""
-                    review_text = ""
-                    review_date = ""
-
-                    # Reviewer name
-                    try:
-                        reviewer_name = review_elem.find_element(By.CSS_SELECTOR, 'div.d4r55').text
-                    except:
-                        pass
-
-                    # Rating (stars)
-                    try:
-                        rating_elem = review_elem.find_element(By.CSS_SELECTOR, 'span[role="img"]')
-                        rating = rating_elem.get_attribute('aria-label').split()[0]
-                    except:
-                        pass
-
-                    # Review text
-                    try:
-                        review_text = review_elem.find_element(By.CSS_SELECTOR, 'span.wiI7pd').text
-                    except:
-                        pass
-
-                    # Date
-                    try:
-                        review_date = review_elem.find_element(By.CSS_SELECTOR, 'span.rsqaWe').text
-                    except:
-                        pass
-
-                    # Skip duplicates
-                    review_key = f"{reviewer_name}_{review_date}"
-                    if review_key in seen_reviews:
-                        continue
-
-                    seen_reviews.add(review_key)
-
-                    reviews_data.append({
-                        'reviewer_name': reviewer_name,
-                        'rating': rating,
-                        'date': review_date,
-                        'review_text': review_text
-                    })
-
-                    print(f"[DEBUG] Scraped review {len(reviews_data)}: {reviewer_name}")
+            self.artifacts.snapshot(self.driver, 'after_scrolling')
 
-                except Exception as e:
-                    print(f"[DEBUG] Error scraping review {idx}: {e}")
-                    continue
+            reviews_data = []
+            extract_start = time.perf_counter()
+            if self.network_capture is not None:
+                records = self.network_capture.collect()
+                reviews_data = review_rows(records, num_reviews, self.language)
+                print(f"[DEBUG] Captured {len(reviews_data)} reviews from network responses")
+
+            if not reviews_data:
+                reviews_data = self.extract_reviews_dom(num_reviews)
+                if reviews_data is None:
+                    return None
+            self.metrics.observe('extract_reviews', time.perf_counter() - extract_start)
+            self.metrics.inc('reviews_scraped', len(reviews_data))
+            self.save_snapshot(kw, 'reviews')
+
+            if self.review_store and place is not None and place.place_id:
+                with self.metrics.timer('store_reviews'):
+                    new_reviews = self.review_store.add_reviews(place.place_id, reviews_data)
+                print(f"[DEBUG] Stored {new_reviews} new reviews in {self.review_store.path}")
+
+            stored_place_id = place.place_id if self.review_store and place is not None else ''
+            if known_ids and stored_place_id and not os.path.isfile(csv_path):
+                # Known to the store from another keyword or a harvest, but new to this keyword: the
+                # scroll stopped at the first stored review, so the CSV starts from everything stored
+                with self.metrics.timer('write_csv'):
+                    saved = self.review_store.export_csv(csv_path, place_id=stored_place_id)
+                print(f"[DEBUG] Saved {saved} reviews from the review store to {csv_path}")
+                return csv_path if saved else None
+
+            if known_reviews and os.path.isfile(csv_path):
+                # Append only the delta to the reviews we already have
+                # Same key as review_rows, so reviews found without an id are not appended again
+                known_keys = known_ids | {r.key for r in known_reviews}
+                reviews_data = [r for r in reviews_data if r.key not in known_keys]
+                if reviews_data:
+                    # Keep the existing header (CSVs written before the published column have one less)
+                    with self.metrics.timer('write_csv'):
+                        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+                            fieldnames = next(csv.reader(csvfile), None) or REVIEW_FIELDNAMES
+                        with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
+                            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+                            writer.writerows(r.to_row() for r in reviews_data)
+                print(f"[DEBUG] Appended {len(reviews_data)} new reviews to {csv_path}")
+                return csv_path
 
             # Save to CSV
             if reviews_data:
-                filename = kw.lower()
-                filename = self.remove_accents(filename)
-                filename = re.sub(r'[^\w\s-]', '', filename)
-                filename = filename.replace(' ', '-')
-                filename = re.sub(r'-+', '-', filename)
-
-                csv_path = f"{self.img_output}{filename}_reviews.csv"
-
-                with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = ['reviewer_name', 'rating', 'date', 'review_text']
+                with self.metrics.timer('write_csv'), open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    fieldnames = REVIEW_FIELDNAMES
                     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                     writer.writeheader()
-                    writer.writerows(reviews_data)
+                    writer.writerows(r.to_row() for r in reviews_data)
 
                 print(f"[DEBUG] Saved {len(reviews_data)} reviews to {csv_path}")
                 return csv_path
@@ -581,7 +879,107 @@ class GoogleMapsDataScraper:
 
         except Exception as e:
             print(f"[DEBUG] Error in scrape_reviews: {e}")
+            self.artifacts.failure(self.driver, 'scrape_reviews', e)
             return None
 
+    def extract_reviews_dom(self, num_reviews):
+        """Read the loaded reviews from the DOM. Returns the rows, or None if no review element matched."""
+        # Last winning selector first, then the rest of the fallback chain
+        review_elements = self.selectors.find_elements(self.driver, 'reviews')
+        print(f"[DEBUG] Found {len(review_elements)} review elements")
+
+        if len(review_elements) == 0:
+            print("[DEBUG] Could not find any reviews with any selector")
+            self.artifacts.failure(self.driver, 'find_reviews', 'no review elements matched')
+            return None
+
+        # One round-trip: expand every truncated review, then read all of them
+        records = self.driver.execute_script(EXTRACT_REVIEWS_SCRIPT, review_elements[:num_reviews * 2]) or []
+        reviews_data = review_rows(records, num_reviews, self.language)
+        print(f"[DEBUG] Extracted {len(reviews_data)} reviews")
+        return reviews_data
+
+    def load_known_reviews(self, csv_path):
+        """Reviews already saved in a place's CSV (empty if there is none)."""
+        try:
+            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+                known_reviews = [Review.from_row(row) for row in csv.DictReader(f)]
+            print(f"[DEBUG] {len(known_reviews)} known reviews in {csv_path}")
+            return known_reviews
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"[DEBUG] Could not read known reviews from {csv_path}: {e}")
+            return []
+
+    def scroll_reviews(self, container, num_reviews, stop_ids=None):
+        """
+        Scroll the reviews container until num_reviews are loaded or the count
+        stops growing for a few ticks. If stop_ids is given, stop as soon as any
+        of those reviews is loaded (with newest-first sorting, everything after
+        it is already known). Returns the number of reviews loaded.
+        """
+        scroll_and_count_script = """
+        const container = arguments[0];
+        const known = new Set(arguments[1]);
+        container.scrollTop = container.scrollHeight;
+        const ids = new Set();
+        let knownSeen = false;
+        for (const el of container.querySelectorAll('div[data-review-id]')) {
+            const id = el.getAttribute('data-review-id');
+            ids.add(id);
+            if (known.has(id)) knownSeen = true;
+        }
+        return [ids.size || container.querySelectorAll('div.jftiEf, div.MyEned').length, knownSeen];
+        """
+        return self.scroll_until('scroll_reviews', container, num_reviews, scroll_and_count_script,
+                                 list(stop_ids or []))
+
+    def scroll_until(self, step, container, limit, scroll_and_count_script, *script_args):
+        """
+        Scroll a lazy-loaded list until limit items are loaded, the count stops
+        growing for a few ticks, or the script reports it is done. The script gets
+        (container, *script_args) and returns [count, done]. The pause between ticks
+        backs off while the list is still loading and resets as soon as new items
+        appear. Time spent is recorded under step. Returns the number of items loaded.
+        """
+        start = time.perf_counter()
+        deadline = start + self.wait.timeouts.get(step, 120)
+        interval = self.wait.scroll_interval
+        loaded = 0
+        stable_ticks = 0
+        ticks = 0
+
+        while loaded < limit and stable_ticks < self.wait.scroll_stable_ticks and time.perf_counter() < deadline:
+            count, done = self.driver.execute_script(scroll_and_count_script, container, *script_args) or (0, False)
+            ticks += 1
+            if done:
+                loaded = max(loaded, count)
+                print(f"[DEBUG] {step}: stop condition reached after {loaded} items")
+                break
+            if count > loaded:
+                loaded = count
+                stable_ticks = 0
+                interval = self.wait.scroll_interval
+            else:
+                stable_ticks += 1
+                interval = min(interval * 2, self.wait.scroll_max_interval)
+
+            if loaded >= limit:
+                break
+            time.sleep(interval)
+
+            if ticks % 5 == 0:
+                print(f"[DEBUG] {step}: scrolled {ticks} times, {loaded} items loaded")
+
+        elapsed = time.perf_counter() - start
+        self.wait.record(step, elapsed)
+        self.metrics.observe(step, elapsed)
+        return loaded
+
     def quit_driver(self):
-        self.driver.quit()
\ No newline at end of file
+        self.driver.quit()
+        if self.owns_image_downloader:
+            self.image_downloader.close()
+            self.image_downloader = None
+            self.owns_image_downloader = False
\ No newline at end of file
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for one run, with a timer helper for phases.
+
+    Recording is an append or an add under a lock, cheap enough to leave on
+    everywhere. Histogram samples are kept raw so p50/p95/p99 are exact and
+    registries from worker processes can be merged.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(float)
+        self.histograms = defaultdict(list)
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name, value):
+        with self.lock:
+            self.histograms[name].append(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block into histogram name (seconds), even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Plain-dict copy, picklable for the trip back from a worker process."""
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {name: list(values) for name, values in self.histograms.items()},
+            }
+
+    def merge(self, snapshot):
+        """Add a snapshot taken elsewhere (e.g. by a worker process) to this registry."""
+        with self.lock:
+            for name, value in snapshot.get('counters', {}).items():
+                self.counters[name] += value
+            for name, values in snapshot.get('histograms', {}).items():
+                self.histograms[name].extend(values)
+
+    def summary(self):
+        """{'counters': {...}, 'histograms': {name: {count, sum, p50, p95, p99, max}}}."""
+        snapshot = self.snapshot()
+        histograms = {}
+        for name, values in snapshot['histograms'].items():
+            values = sorted(values)
+            stats = {'count': len(values), 'sum': sum(values), 'max': values[-1] if values else 0.0}
+            for q in QUANTILES:
+                stats[f'p{int(q * 100)}'] = percentile(values, q)
+            histograms[name] = stats
+        return {'counters': snapshot['counters'], 'histograms': histograms}
+
+    def print_summary(self):
+        summary = self.summary()
+        if summary['histograms']:
+            print('----------\nTime per phase (s)')
+            print(f'{"PHASE":<20}{"COUNT":>8}{"TOTAL":>10}{"P50":>8}{"P95":>8}{"P99":>8}{"MAX":>8}')
+            for name, s in sorted(summary['histograms'].items(), key=lambda item: item[1]['sum'], reverse=True):
+                print(f'{name:<20}{s["count"]:>8}{s["sum"]:>10.1f}{s["p50"]:>8.2f}{s["p95"]:>8.2f}'
+                      f'{s["p99"]:>8.2f}{s["max"]:>8.2f}')
+        if summary['counters']:
+            print('----------\nCounters')
+            for name, value in sorted(summary['counters'].items()):
+                print(f'{name:<32}{value:>10g}')
+
+    def to_prometheus(self, prefix='maps_scraper'):
+        """Prometheus text exposition: counters as *_total, histograms as summaries with quantiles."""
+        summary = self.summary()
+        lines = []
+        for name, value in sorted(summary['counters'].items()):
+            metric = f'{prefix}_{_metric_name(name)}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value:g}']
+        if summary['histograms']:
+            metric = f'{prefix}_phase_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for name, s in sorted(summary['histograms'].items()):
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{phase="{name}",quantile="{q}"}} {s[f"p{int(q * 100)}"]:.6f}')
+                lines.append(f'{metric}_sum{{phase="{name}"}} {s["sum"]:.6f}')
+                lines.append(f'{metric}_count{{phase="{name}"}} {s["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the summary to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(dict(self.summary(), written_at=time.time()), indent=2)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f'[INFO] Metrics written to {path}')
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
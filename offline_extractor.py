@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""
+Re-extract place details and reviews from saved HTML snapshots, without a browser.
+
+Snapshots are written by the scraper when save_snapshots is on, as
+snapshots/<keyword>.place.html and snapshots/<keyword>.reviews.html. When Google
+renames a class, fix the XPaths below and re-run this over the stored pages.
+
+Usage:
+    python offline_extractor.py <snapshots_folder> <ES|EN> [output_folder]
+"""
+
+import csv
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+from export_data import MapDataExporter
+from place_maps import REVIEW_FIELDNAMES, MapsPlace, language_config, parse_count, parse_decimal, review_rows
+
+# Same order as the live scraper's selector fallbacks
+REVIEW_XPATHS = [
+    '//div[contains(concat(" ", normalize-space(@class), " "), " jftiEf ")]',
+    '//div[@data-review-id]',
+    '//div[contains(concat(" ", normalize-space(@class), " "), " MyEned ")]',
+    '//div[contains(concat(" ", normalize-space(@class), " "), " WNxzHc ")]',
+    '//div[contains(@class, "fontBodyMedium") and .//span[@role="img"]]',
+]
+
+
+def _class_xpath(tag, class_name):
+    return f'.//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+
+def _text(node):
+    """Approximate innerText: <br> becomes a newline and whitespace runs collapse."""
+    if node is None:
+        return ''
+    for br in node.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    lines = [' '.join(line.split()) for line in node.text_content().split('\n')]
+    return '\n'.join(line for line in lines if line).strip()
+
+
+def _first(nodes):
+    return nodes[0] if nodes else None
+
+
+def _label(tree, text):
+    node = _first(tree.xpath('//*[contains(@aria-label, $text)]', text=text))
+    return node.get('aria-label') if node is not None else ''
+
+
+def read_snapshot(path):
+    """Return (keyword, parsed tree) for a snapshot file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    match = re.match(r'<!-- keyword: (.*?) -->', content)
+    keyword = match.group(1) if match else os.path.basename(path).split('.')[0]
+    return keyword, lxml_html.fromstring(content)
+
+
+def parse_place(tree, config, keyword='', language='EN'):
+    """Place details from a place page snapshot, mirroring GoogleMapsDataScraper.scrape_place."""
+    place = MapsPlace()
+    place.keyword = keyword
+
+    for title in tree.xpath('//h1'):
+        text = _text(title)
+        if text not in ('', 'Results', 'Resultados'):
+            place.name = text
+            break
+
+    rating = _first(tree.xpath('//*[contains(@aria-label, $text) and @role="img"]', text=config['stars_text']))
+    if rating is not None:
+        rating_text = _text(rating)
+        if '(' in rating_text and ')' in rating_text:
+            parts = rating_text.replace(')', '').split('(')
+            stars, num_reviews = parts[0], parts[1]
+        else:
+            stars = rating.get('aria-label', '').replace(config['stars_text'], '').replace(' ', '')
+            num_reviews = _label(tree, config['reviews_text']).replace(config['reviews_text'], '').replace(' ', '')
+        if config['stars_text'] not in stars and config['reviews_text'] not in stars:
+            place.stars = parse_decimal(stars, language)
+        if config['stars_text'] not in num_reviews and config['reviews_text'] not in num_reviews:
+            place.reviews = parse_count(num_reviews, language)
+
+    place.category = _text(_first(tree.xpath('//button[contains(@jsaction, "pane.") and contains(@jsaction, ".category")]')))
+    place.address = _label(tree, config['address_text']).replace(config['address_text'], '').strip()
+    place.web = _label(tree, config['website_text']).replace(config['website_text'], '').strip()
+    place.phone = _label(tree, config['phone_text']).replace(config['phone_text'], '').strip()
+    place.pluscode = _label(tree, config['pluscode_text']).replace(config['pluscode_text'], '').strip()
+
+    hours = _label(tree, config['hours_text'])
+    if hours:
+        hours = hours.replace(config['hours_replace'][0], '')
+        hours = hours.replace(config['hours_replace'][1], '')
+        hours = hours.replace(config['hours_replace'][2], '\n')
+    place.hours = hours
+
+    return place
+
+
+def parse_reviews(tree, num_reviews=200, language='EN', reference=None):
+    """
+    Reviews from a reviews tab snapshot, mirroring EXTRACT_REVIEWS_SCRIPT. Relative
+    dates are resolved against reference (the time the snapshot was taken).
+    """
+    elements = []
+    for xpath in REVIEW_XPATHS:
+        elements = tree.xpath(xpath)
+        if elements:
+            break
+
+    records = []
+    for el in elements[:num_reviews * 2]:
+        id_node = el if el.get('data-review-id') else _first(el.xpath('.//*[@data-review-id]'))
+        rating = _first(el.xpath('.//span[@role="img"]'))
+        rating_label = (rating.get('aria-label') or '').strip() if rating is not None else ''
+        records.append({
+            'review_id': id_node.get('data-review-id') if id_node is not None else '',
+            'reviewer_name': _text(_first(el.xpath(_class_xpath('div', 'd4r55')))),
+            'rating': rating_label.split()[0] if rating_label else '',
+            'date': _text(_first(el.xpath(_class_xpath('span', 'rsqaWe')))),
+            'review_text': _text(_first(el.xpath(_class_xpath('span', 'wiI7pd')))),
+        })
+
+    return review_rows(records, num_reviews, language, reference)
+
+
+def extract_snapshot_pair(base_path, language):
+    """
+    Extract one place from <base>.place.html and/or <base>.reviews.html.
+    Returns (keyword, place dict or None, Review list).
+    """
+    config = language_config(language)
+    keyword = os.path.basename(base_path)
+    place = None
+    rows = []
+
+    place_path = f'{base_path}.place.html'
+    if os.path.isfile(place_path):
+        keyword, tree = read_snapshot(place_path)
+        place = parse_place(tree, config, keyword, language).to_dict()
+
+    reviews_path = f'{base_path}.reviews.html'
+    if os.path.isfile(reviews_path):
+        keyword, tree = read_snapshot(reviews_path)
+        rows = parse_reviews(tree, language=language, reference=datetime.fromtimestamp(os.path.getmtime(reviews_path)))
+
+    return keyword, place, rows
+
+
+def extract_snapshots(snapshot_folder, language, output_folder, workers=None):
+    """Re-extract every snapshot in snapshot_folder in parallel across cores."""
+    if lxml_html is None:
+        raise ImportError('lxml is required for offline extraction: pip install lxml')
+
+    bases = sorted({path.rsplit('.', 2)[0] for path in glob.glob(os.path.join(snapshot_folder, '*.html'))})
+    print(f'[INFO] Re-extracting {len(bases)} snapshot(s) from {snapshot_folder}')
+
+    places = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for base, (keyword, place, rows) in zip(bases, executor.map(extract_snapshot_pair, bases,
+                                                                    [language] * len(bases), chunksize=16)):
+            if rows:
+                csv_path = os.path.join(output_folder, f'{os.path.basename(base)}_reviews.csv')
+                with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=REVIEW_FIELDNAMES)
+                    writer.writeheader()
+                    writer.writerows(review.to_row() for review in rows)
+            else:
+                csv_path = ''
+
+            if place is not None:
+                place = MapsPlace.from_dict(place)
+                place.csv_path = csv_path
+                places.append(place)
+            print(f'[INFO] {keyword}: {"place, " if place is not None else ""}{len(rows)} reviews')
+
+    return places
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('ES', 'EN'):
+        print(f'Usage: python {os.path.basename(__file__)} <snapshots_folder> <ES|EN> [output_folder]')
+        sys.exit(1)
+
+    snapshot_folder = sys.argv[1]
+    language = sys.argv[2]
+    output_folder = sys.argv[3] if len(sys.argv) > 3 else os.path.join(snapshot_folder, 'offline')
+    os.makedirs(output_folder, exist_ok=True)
+
+    places = extract_snapshots(snapshot_folder, language, output_folder)
+    if places:
+        exporter = MapDataExporter('00_offline_output', output_folder, places)
+        exporter.export('xlsx')
+    print(f'[SUCCESS] Re-extracted {len(places)} place(s) into {output_folder}')
+
+
+if __name__ == "__main__":
+    main()
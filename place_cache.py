@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sqlite3
+import time
+from threading import Lock
+
+from place_maps import MapsPlace
+
+
+def is_place_url(kw):
+    """True if a keyword is actually a Google Maps place URL (e.g. queued by a results harvest)."""
+    return kw.startswith(('http://', 'https://')) and '/maps/place/' in kw
+
+
+class PlaceCache:
+    """
+    Persistent keyword -> resolved place cache, stored in SQLite with a TTL.
+
+    A hit lets a worker open the place page directly with driver.get instead of
+    searching. The cache also keeps an in-memory registry of the places scraped
+    during the current run, keyed by place id, so keywords that resolve to the
+    same place are merged instead of scraped again.
+    """
+
+    def __init__(self, path, ttl_days=30):
+        self.path = path
+        self.ttl = ttl_days * 24 * 3600
+        self.lock = Lock()
+        self.run_places = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS place_cache (
+                keyword     TEXT PRIMARY KEY,
+                place_url   TEXT NOT NULL,
+                place_id    TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        ''')
+
+    @staticmethod
+    def path_for(output_folder):
+        return os.path.join(output_folder, 'place_cache.sqlite')
+
+    @staticmethod
+    def place_id_from_url(url):
+        """
+        Stable place id from a /maps/place/ URL: the ChIJ place id if present, else the
+        0x..:0x.. feature id. '' if the URL has neither: the place name alone would
+        merge different places of the same chain.
+        """
+        if not url or '/maps/place/' not in url:
+            return ''
+        match = re.search(r'!19s(ChIJ[\w-]+)', url)
+        if match:
+            return match.group(1)
+        match = re.search(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', url)
+        if match:
+            return match.group(1)
+        return ''
+
+    def lookup(self, kw):
+        """Return (place_url, place_id) for a keyword, or None if unknown or expired."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT place_url, place_id, resolved_at FROM place_cache WHERE keyword = ?', (kw,)
+            ).fetchone()
+        if row is None or time.time() - row[2] > self.ttl:
+            return None
+        return row[0], row[1]
+
+    def store(self, kw, place_url, place_id):
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO place_cache (keyword, place_url, place_id, resolved_at) VALUES (?, ?, ?, ?)',
+                (kw, place_url, place_id, time.time())
+            )
+
+    def forget(self, kw):
+        """Drop a cache entry whose URL no longer opens a place."""
+        with self.lock:
+            self.conn.execute('DELETE FROM place_cache WHERE keyword = ?', (kw,))
+
+    def register(self, place):
+        """Remember a place scraped in this run."""
+        if place.place_id:
+            with self.lock:
+                self.run_places.setdefault(place.place_id, place)
+
+    def merged(self, place_id, kw):
+        """
+        If place_id was already scraped in this run, return a copy of that result
+        under keyword kw; otherwise None.
+        """
+        with self.lock:
+            existing = self.run_places.get(place_id) if place_id else None
+        if existing is None:
+            return None
+        place = MapsPlace.from_dict(existing.to_dict())
+        place.keyword = kw
+        return place
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,8 +1,119 @@
 # -*- coding: utf-8 -*-
 
+import re
+from datetime import date, datetime, timedelta
+
+# Relative review dates as Google shows them ("3 weeks ago", "hace un mes"), in days per unit.
+# Reviews from the last day ("3 hours ago", "hace 5 minutos") resolve to the reference date.
+DATE_UNITS = {
+    'minute': 0, 'minutes': 0, 'minuto': 0, 'minutos': 0,
+    'hour': 0, 'hours': 0, 'hora': 0, 'horas': 0,
+    'day': 1, 'days': 1, 'día': 1, 'días': 1, 'dia': 1, 'dias': 1,
+    'week': 7, 'weeks': 7, 'semana': 7, 'semanas': 7,
+    'month': 30, 'months': 30, 'mes': 30, 'meses': 30,
+    'year': 365, 'years': 365, 'año': 365, 'años': 365,
+}
+DATE_ONE = ('a', 'an', 'un', 'una')
+DATE_PATTERN = re.compile(r'\b(\d+|an?|una?)\s+(\w+)', re.UNICODE)
+
+# Abbreviated counts on result cards: "1.2K", "1,2 mil"
+COUNT_MULTIPLIERS = {'k': 1000, 'mil': 1000, 'm': 1000000, 'mill': 1000000}
+
+
+def parse_decimal(text, language='EN'):
+    """
+    '4,5' (ES) or '4.5' (EN) -> 4.5. The decimal separator follows the
+    Google Maps interface language; returns None for empty or unparseable text.
+    """
+    if text is None or isinstance(text, (int, float)):
+        return None if text is None else float(text)
+    text = re.sub(r'[^\d,.]', '', text)
+    if not text:
+        return None
+    decimal, thousands = (',', '.') if language == 'ES' else ('.', ',')
+    if decimal not in text and re.fullmatch(r'\d+[.,]\d{1,2}', text):
+        # A lone separator followed by one or two digits can only be a decimal point
+        text = text.replace(',', '.')
+    else:
+        text = text.replace(thousands, '').replace(decimal, '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_count(text, language='EN'):
+    """'1.234' (ES), '1,234' (EN), '(87)' or '1.2K' -> int; None for empty or unparseable text."""
+    if text is None or isinstance(text, (int, float)):
+        return None if text is None else int(text)
+    match = re.search(r'([\d.,]+)\s*([a-zA-Z]*)', text)
+    if not match:
+        return None
+    multiplier = COUNT_MULTIPLIERS.get(match.group(2).lower().rstrip('.'))
+    if multiplier:
+        value = parse_decimal(match.group(1), language)
+        return int(round(value * multiplier)) if value is not None else None
+    digits = re.sub(r'\D', '', match.group(1))
+    return int(digits) if digits else None
+
+
+def parse_review_date(text, reference=None):
+    """
+    Approximate calendar date of a relative review date ('2 weeks ago', 'hace un mes',
+    'Edited a year ago'), counted back from reference (default: now). None if unrecognised.
+    """
+    if not text:
+        return None
+    match = DATE_PATTERN.search(text.lower())
+    if not match or match.group(2) not in DATE_UNITS:
+        return None
+    amount = 1 if match.group(1) in DATE_ONE else int(match.group(1))
+    reference = reference or datetime.now()
+    return (reference - timedelta(days=amount * DATE_UNITS[match.group(2)])).date()
+
+
+def _to_float(value):
+    """Stored (canonical) value back to float; tolerates legacy locale strings such as '4,5'."""
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return parse_decimal(str(value))
+
+
+def _to_int(value):
+    """Stored (canonical) value back to int; tolerates legacy locale strings such as '1.234'."""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return parse_count(str(value))
+
+
+def _to_date(value):
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
 
 class MapsPlace:
-    """Represents a Google Maps place with all its scraped data."""
+    """
+    Represents a Google Maps place with all its scraped data.
+
+    stars is a float and reviews an int (None when unknown), parsed once at
+    scrape time with parse_decimal / parse_count; the rest are strings.
+    """
+
+    FIELDS = ('keyword', 'name', 'category', 'address', 'phone', 'web', 'pluscode', 'stars', 'reviews', 'hours',
+              'csv_path', 'url', 'place_id')
+    __slots__ = FIELDS
 
     def __init__(self):
         self.keyword = ''
@@ -12,7 +123,139 @@ class MapsPlace:
         self.phone = ''
         self.web = ''
         self.pluscode = ''
-        self.stars = ''
-        self.reviews = ''
+        self.stars = None
+        self.reviews = None
         self.hours = ''
         self.csv_path = ''
+        self.url = ''
+        self.place_id = ''
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a place from to_dict() output, a JSON line or a CSV row (where every value is a string)."""
+        place = cls()
+        for field in cls.FIELDS:
+            if field in data:
+                setattr(place, field, data[field] if data[field] is not None else '')
+        place.stars = _to_float(place.stars)
+        place.reviews = _to_int(place.reviews)
+        return place
+
+
+class Review:
+    """
+    One review. rating is a float (None when unknown) and published the
+    approximate date derived from the relative date text at scrape time, which
+    is kept as-is in date. CSV rows are written and read with to_row / from_row.
+    """
+
+    FIELDS = ('review_id', 'reviewer_name', 'rating', 'date', 'review_text', 'published')
+    __slots__ = FIELDS
+
+    def __init__(self, review_id='', reviewer_name='', rating=None, date='', review_text='', published=None):
+        self.review_id = review_id
+        self.reviewer_name = reviewer_name
+        self.rating = rating
+        self.date = date
+        self.review_text = review_text
+        self.published = published
+
+    @property
+    def key(self):
+        """Identity used to deduplicate reviews: the review id, or reviewer name + date without one."""
+        return self.review_id or f'{self.reviewer_name}_{self.date}'
+
+    @classmethod
+    def from_record(cls, record, language='EN', reference=None):
+        """Parse a raw scraped record (all strings, REVIEW_FIELDNAMES keys) into a typed review."""
+        return cls(
+            review_id=record.get('review_id') or '',
+            reviewer_name=record.get('reviewer_name') or '',
+            rating=parse_decimal(record.get('rating') or '', language),
+            date=record.get('date') or '',
+            review_text=record.get('review_text') or '',
+            published=parse_review_date(record.get('date') or '', reference),
+        )
+
+    def to_row(self):
+        """CSV row: canonical numbers and an ISO published date."""
+        return {
+            'review_id': self.review_id,
+            'reviewer_name': self.reviewer_name,
+            'rating': '' if self.rating is None else f'{self.rating:g}',
+            'date': self.date,
+            'review_text': self.review_text,
+            'published': self.published.isoformat() if self.published else '',
+        }
+
+    @classmethod
+    def from_row(cls, row):
+        """Review from a CSV row written by to_row (older CSVs without a published column are fine)."""
+        return cls(
+            review_id=row.get('review_id') or '',
+            reviewer_name=row.get('reviewer_name') or '',
+            rating=_to_float(row.get('rating')),
+            date=row.get('date') or '',
+            review_text=row.get('review_text') or '',
+            published=_to_date(row.get('published')),
+        )
+
+
+REVIEW_FIELDNAMES = list(Review.FIELDS)
+
+
+def review_rows(records, num_reviews, language='EN', reference=None):
+    """
+    Turn raw review records (read from the page, the network capture or a
+    saved snapshot) into unique, typed Review objects. Relative dates are resolved against
+    reference (default: now).
+    """
+    rows = []
+    seen_reviews = set()  # Track unique reviews by review id (or reviewer name + date)
+    reference = reference or datetime.now()
+
+    for record in records:
+        if len(rows) >= num_reviews:
+            break
+
+        review = Review.from_record(record, language, reference)
+        if review.key in seen_reviews:
+            continue
+        seen_reviews.add(review.key)
+        rows.append(review)
+
+    return rows
+
+
+def language_config(language):
+    """Google Maps interface texts for language ('ES' or 'EN'), used to build selectors and parse labels."""
+    config = {
+        'language': '--lang=es-ES',
+        'stars_text': 'estrellas',
+        'reviews_text': 'reseñas',
+        'address_text': 'Dirección: ',
+        'website_text': 'Sitio web: ',
+        'phone_text': 'Teléfono: ',
+        'pluscode_text': 'Plus Code: ',
+        'hours_text': 'Ocultar el horario de la semana',
+        'hours_replace': [' Ocultar el horario de la semana', 'El horario podría cambiar', '; '],
+        'sort_text': 'Ordenar',
+        'newest_text': 'Más recientes'
+    }
+    if language == 'EN':
+        config['language'] = '--lang=en-GB'
+        config['stars_text'] = 'stars'
+        config['reviews_text'] = 'reviews'
+        config['address_text'] = 'Address: '
+        config['website_text'] = 'Website: '
+        config['phone_text'] = 'Phone: '
+        config['pluscode_text'] = 'Plus code: '
+        config['hours_text'] = 'Hide open hours for the week'
+        config['hours_replace'] = ['. Hide open hours for the week', 'Hours might differ', '; ']
+        config['sort_text'] = 'Sort'
+        config['newest_text'] = 'Newest'
+
+    return config
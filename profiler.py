@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for every thread of the process.
+
+    A daemon thread reads sys._current_frames() every interval seconds and
+    counts each thread's stack, weighted by the real time since the previous
+    sample. Being wall-clock, blocked time shows up too: a WebDriver round-trip
+    appears as socket reads under find_element, a politeness pause as sleep.
+    Work inside span(label) (a keyword, a review file) gets the label as an extra
+    frame under the thread, so one flamegraph separates keywords. Output is
+    collapsed stacks (flamegraph.pl, speedscope) and speedscope JSON with one
+    profile per thread. Each worker process runs its own profiler.
+    """
+
+    def __init__(self, interval=0.01, name='profile'):
+        """
+        Args:
+            interval: Seconds between samples (0.01 = 100 Hz).
+            name: Profile name shown by speedscope.
+        """
+        self.interval = interval
+        self.name = name
+        self.lock = threading.Lock()
+        # (thread name, stack tuple) -> seconds
+        self.stacks = defaultdict(float)
+        self.spans = {}
+        self.frame_names = {}
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    @contextmanager
+    def span(self, label):
+        """Label the current thread's samples with label for the duration of the block."""
+        ident = threading.get_ident()
+        label = f'[{label}]'.replace(';', ',').replace('\n', ' ')
+        with self.lock:
+            outer = self.spans.get(ident)
+            self.spans[ident] = label
+        try:
+            yield
+        finally:
+            with self.lock:
+                if outer is None:
+                    self.spans.pop(ident, None)
+                else:
+                    self.spans[ident] = outer
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            weight = now - last
+            last = now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, frame in frames.items():
+                    if ident == own:
+                        continue
+                    stack = self._stack(frame)
+                    span = self.spans.get(ident)
+                    if span:
+                        stack = (span,) + stack
+                    self.stacks[(names.get(ident, f'thread-{ident}'), stack)] += weight
+
+    def _stack(self, frame):
+        """Frame names from the outermost call to frame."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            name = self.frame_names.get(code)
+            if name is None:
+                name = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                self.frame_names[code] = name
+            stack.append(name)
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def collapsed(self):
+        """Collapsed-stack lines: 'thread;frame;...;frame <milliseconds>'."""
+        with self.lock:
+            items = list(self.stacks.items())
+        return [f'{";".join((thread,) + stack)} {round(seconds * 1000)}'
+                for (thread, stack), seconds in sorted(items) if round(seconds * 1000) > 0]
+
+    def speedscope(self):
+        """Speedscope file (one sampled profile per thread, in seconds) as a dict."""
+        with self.lock:
+            items = list(self.stacks.items())
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for (thread, stack), seconds in sorted(items):
+            indexes = []
+            for name in stack:
+                if name not in frame_index:
+                    frame_index[name] = len(frames)
+                    frames.append({'name': name})
+                indexes.append(frame_index[name])
+            profile = profiles.setdefault(thread, {
+                'type': 'sampled', 'name': thread, 'unit': 'seconds', 'startValue': 0,
+                'endValue': 0, 'samples': [], 'weights': [],
+            })
+            profile['samples'].append(indexes)
+            profile['weights'].append(seconds)
+            profile['endValue'] += seconds
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': self.name,
+            'exporter': 'google_maps_scraper profiler',
+            'shared': {'frames': frames},
+            'profiles': list(profiles.values()),
+        }
+
+    def write(self, base_path):
+        """Write <base_path>.folded and <base_path>.speedscope.json. Returns both paths."""
+        folder = os.path.dirname(base_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        folded_path = f'{base_path}.folded'
+        speedscope_path = f'{base_path}.speedscope.json'
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+        with open(speedscope_path, 'w', encoding='utf-8') as f:
+            json.dump(self.speedscope(), f)
+        print(f'[INFO] Profile written to {speedscope_path} (and {os.path.basename(folded_path)})')
+        return folded_path, speedscope_path
+
+    @staticmethod
+    def base_path_for(output_folder, name):
+        return os.path.join(output_folder, 'profiles', f'{name}_{time.strftime("%Y%m%d-%H%M%S")}')
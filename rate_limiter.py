@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from threading import Lock
+
+
+class RateLimiter:
+    """
+    Token bucket that caps the request rate of every worker sharing it.
+
+    Tokens refill at rpm / 60 per second up to burst; each navigation or search
+    takes one and waits if the bucket is empty. After a token is taken, a random
+    jitter of up to `jitter` times the refill interval is added, so workers do
+    not fire in lockstep. Thread-safe; see SharedRateLimiter for processes.
+    acquire_async is the same for asyncio tasks, and can take several tokens at
+    once (e.g. a request's estimated tokens against a tokens-per-minute budget).
+    """
+
+    def __init__(self, rpm=60, burst=1, jitter=0.3):
+        """
+        Args:
+            rpm: Requests per minute allowed across all workers sharing this limiter.
+            burst: Requests that may go out back to back after an idle period.
+            jitter: Extra random delay after each acquire, as a fraction of 60 / rpm seconds.
+        """
+        self.rpm = rpm
+        self.rate = rpm / 60.0
+        self.capacity = max(1, burst)
+        self.jitter = jitter
+        self.lock = Lock()
+        self.tokens = float(self.capacity)
+        self.updated = self.now()
+
+    def now(self):
+        return time.monotonic()
+
+    def acquire(self):
+        """Block until a request may go out. Returns the seconds spent waiting."""
+        start = time.perf_counter()
+        while True:
+            wait = self._take(self.now())
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        if self.jitter > 0:
+            time.sleep(random.uniform(0, self.jitter / self.rate))
+        return time.perf_counter() - start
+
+    async def acquire_async(self, amount=1):
+        """Like acquire, without blocking the event loop. amount is capped at burst."""
+        start = time.perf_counter()
+        amount = min(amount, self.capacity)
+        while True:
+            wait = self._take(self.now(), amount)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        if self.jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.jitter / self.rate))
+        return time.perf_counter() - start
+
+    def _refill(self, tokens, updated, now):
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+
+    def _take(self, now, amount=1):
+        """Take amount tokens if available (returns 0), else return how long until they are."""
+        with self.lock:
+            self.tokens = self._refill(self.tokens, self.updated, now)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0
+            return (amount - self.tokens) / self.rate
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    The same token bucket kept in a SQLite file, so separate worker processes
+    (or separate runs) draw from one budget. Each take is a BEGIN IMMEDIATE
+    transaction, which serialises the read-refill-write across processes.
+    """
+
+    def __init__(self, path, rpm=60, burst=1, jitter=0.3, name='google_maps'):
+        self.path = path
+        self.name = name
+        super().__init__(rpm, burst, jitter)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limit (
+                name       TEXT PRIMARY KEY,
+                tokens     REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+
+    @staticmethod
+    def path_for(output_folder):
+        return os.path.join(output_folder, 'rate_limit.sqlite')
+
+    def now(self):
+        # Wall clock: monotonic clocks are not comparable between processes
+        return time.time()
+
+    def _take(self, now, amount=1):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.conn.execute('SELECT tokens, updated_at FROM rate_limit WHERE name = ?',
+                                        (self.name,)).fetchone()
+                tokens = self.capacity if row is None else self._refill(row[0], row[1], now)
+                if tokens >= amount:
+                    tokens -= amount
+                    wait = 0
+                else:
+                    wait = (amount - tokens) / self.rate
+                self.conn.execute('INSERT OR REPLACE INTO rate_limit (name, tokens, updated_at) VALUES (?, ?, ?)',
+                                  (self.name, tokens, now))
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return wait
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class ResourceGovernor:
+    """
+    Decides how many browser workers this machine can carry right now.
+
+    Scales up one worker at a time while memory and CPU load have headroom,
+    and backs off one at a time when system memory, load per CPU or the total
+    RSS of Chrome processes crosses its threshold. Needs psutil; without it
+    the governor simply allows max_workers.
+    """
+
+    def __init__(self, min_workers=1, max_workers=4, max_memory_percent=85.0, max_load_per_cpu=1.5,
+                 max_chrome_rss_percent=60.0, interval=10.0):
+        """
+        Args:
+            min_workers: Never go below this many workers.
+            max_workers: Never go above this many workers.
+            max_memory_percent: Back off above this system memory usage (%).
+            max_load_per_cpu: Back off above this 1-minute load average per CPU.
+            max_chrome_rss_percent: Back off when Chrome processes together use more than this share of RAM (%).
+            interval: Seconds between scaling decisions.
+        """
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.max_memory_percent = max_memory_percent
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_chrome_rss_percent = max_chrome_rss_percent
+        self.interval = interval
+        self.cpu_count = os.cpu_count() or 1
+
+        if psutil is None:
+            print('[WARNING] psutil is not installed: worker count will not adapt to memory/CPU usage')
+
+    def sample(self):
+        """Current memory %, load per CPU and Chrome RSS as % of total RAM."""
+        memory = psutil.virtual_memory()
+        load_per_cpu = psutil.getloadavg()[0] / self.cpu_count
+
+        chrome_rss = 0
+        for proc in psutil.process_iter(['name', 'memory_info']):
+            name = (proc.info.get('name') or '').lower()
+            if 'chrome' in name and proc.info.get('memory_info'):
+                chrome_rss += proc.info['memory_info'].rss
+
+        return {
+            'memory_percent': memory.percent,
+            'load_per_cpu': load_per_cpu,
+            'chrome_rss_percent': chrome_rss * 100.0 / memory.total,
+        }
+
+    def target(self, current):
+        """Worker count to move towards from `current` (changes by at most one per call)."""
+        if psutil is None:
+            return self.max_workers
+
+        try:
+            s = self.sample()
+        except Exception as e:
+            print(f'[WARNING] Could not sample system resources: {e}')
+            return current
+
+        overloaded = (s['memory_percent'] > self.max_memory_percent or
+                      s['load_per_cpu'] > self.max_load_per_cpu or
+                      s['chrome_rss_percent'] > self.max_chrome_rss_percent)
+        if overloaded:
+            target = max(self.min_workers, current - 1)
+        elif (s['memory_percent'] < self.max_memory_percent * 0.85 and
+              s['load_per_cpu'] < self.max_load_per_cpu * 0.75 and
+              s['chrome_rss_percent'] < self.max_chrome_rss_percent * 0.85):
+            target = min(self.max_workers, current + 1)
+        else:
+            target = current
+
+        if target != current:
+            print(f"[INFO] Resources: memory {s['memory_percent']:.0f}%, load/cpu {s['load_per_cpu']:.2f}, "
+                  f"chrome {s['chrome_rss_percent']:.0f}% -> workers {current} -> {target}")
+        return target
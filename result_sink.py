@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import json
+import os
+import time
+from threading import Lock
+
+from place_maps import MapsPlace
+
+
+class ResultSink:
+    """
+    Append-only stream of scraped places, written as each place finishes.
+
+    Places are buffered and appended in small batches; the file is fsynced at
+    most every fsync_interval seconds (and on close), so a crash loses at most
+    the last few places instead of the whole run. Safe to share between threads.
+    Subclasses define the on-disk format.
+    """
+
+    EXTENSION = ''
+
+    def __init__(self, path, fresh=False, buffer_size=10, fsync_interval=5.0):
+        """
+        Args:
+            path: File to append to (created if missing).
+            fresh: Truncate the file first (a new run) instead of appending (a resumed run).
+            buffer_size: Places kept in memory before they are appended to the file.
+            fsync_interval: Longest time (seconds) between fsyncs of the appended data.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+        self.buffer = []
+        self.lock = Lock()
+        self.last_sync = time.monotonic()
+        self.written = 0
+
+        if not fresh:
+            self._drop_partial_record(path)
+        is_new = fresh or not os.path.isfile(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'w' if fresh else 'a', newline='', encoding='utf-8')
+        self._open(is_new)
+
+    @classmethod
+    def path_for(cls, output_folder, keywords_file):
+        """Stream file for a keywords file, next to its journal."""
+        name = os.path.splitext(os.path.basename(keywords_file))[0]
+        return os.path.join(output_folder, f'{name}.places.{cls.EXTENSION}')
+
+    def write(self, place):
+        with self.lock:
+            self.buffer.append(place.to_dict())
+            if len(self.buffer) >= self.buffer_size or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush(sync=True)
+
+    def close(self):
+        with self.lock:
+            self._flush(sync=True)
+            self.file.close()
+        print(f'[INFO] {self.written} place(s) streamed to {self.path}')
+
+    def _flush(self, sync=False):
+        if self.buffer:
+            self._write_rows(self.buffer)
+            self.written += len(self.buffer)
+            self.buffer = []
+            self.file.flush()
+        if sync or time.monotonic() - self.last_sync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self.last_sync = time.monotonic()
+
+    @staticmethod
+    def _drop_partial_record(path):
+        """Cut a record left half-written by a crash, so the next one starts on a line of its own."""
+        if not os.path.isfile(path):
+            return
+        with open(path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+
+    @staticmethod
+    def key(place):
+        """Identity of a streamed place: the keyword it was found by and its place id (or name)."""
+        return place.keyword, place.place_id or place.name
+
+    @classmethod
+    def read_places(cls, path):
+        """
+        Places in a stream file, in the order they were scraped. A place streamed
+        twice (e.g. re-scraped after a crash) is kept once, with its latest data.
+        """
+        places = {}
+        if os.path.isfile(path):
+            for data in cls._read_rows(path):
+                place = MapsPlace.from_dict(data)
+                key = cls.key(place)
+                places.pop(key, None)
+                places[key] = place
+        return list(places.values())
+
+    def _open(self, is_new):
+        pass
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+    @classmethod
+    def _read_rows(cls, path):
+        raise NotImplementedError
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per line."""
+
+    EXTENSION = 'jsonl'
+
+    def _write_rows(self, rows):
+        self.file.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+    @classmethod
+    def _read_rows(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+
+
+class CsvSink(ResultSink):
+    """CSV with a MapsPlace.FIELDS header."""
+
+    EXTENSION = 'csv'
+
+    def _open(self, is_new):
+        self.writer = csv.DictWriter(self.file, fieldnames=MapsPlace.FIELDS)
+        if is_new:
+            self.writer.writeheader()
+
+    def _write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    @classmethod
+    def _read_rows(cls, path):
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+
+
+SINKS = {'jsonl': JsonlSink, 'csv': CsvSink}
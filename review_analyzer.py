@@ -1,35 +1,86 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import csv
 import json
 import os
+import re
 from collections import Counter
 from typing import List, Dict, Tuple
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
+from metrics import MetricsRegistry
+from place_maps import Review
+from rate_limiter import RateLimiter
+
 # Load environment variables
 load_dotenv()
 
+DEFAULT_CONCURRENCY = 4
+# Completion tokens reserved per batch request against the tokens-per-minute ceiling
+BATCH_COMPLETION_TOKENS = 300
+
 class ReviewAnalyzer:
     """
     Analyzes Google Maps reviews using OpenAI API to extract common positive and negative themes.
     """
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, metrics=None, base_url=None, concurrency=None, rpm=None, tpm=None):
         """
         Initialize the analyzer with OpenAI API key.
         
         Args:
             api_key: OpenAI API key. If None, will try to load from OPENAI_API_KEY env variable.
+            metrics: Optional MetricsRegistry for API call timings and token counts.
+            base_url: OpenAI-compatible endpoint, e.g. a local stand-in (default: OPENAI_BASE_URL or the OpenAI API).
+            concurrency: Batch requests in flight at once (default: ANALYZER_CONCURRENCY or 4).
+            rpm: Batch requests per minute ceiling (default: ANALYZER_RPM, unset for none).
+            tpm: Estimated tokens per minute ceiling for batch requests (default: ANALYZER_TPM, unset for none).
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL') or None
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.metrics = metrics or MetricsRegistry()
+        self.concurrency = max(1, concurrency or int(os.getenv('ANALYZER_CONCURRENCY') or DEFAULT_CONCURRENCY))
+        rpm = rpm or int(os.getenv('ANALYZER_RPM') or 0)
+        tpm = tpm or int(os.getenv('ANALYZER_TPM') or 0)
+        self.request_limiter = RateLimiter(rpm, burst=self.concurrency, jitter=0) if rpm else None
+        # A minute's worth of tokens may go out at once, as with the API's own limit
+        self.token_limiter = RateLimiter(tpm, burst=tpm, jitter=0) if tpm else None
+
+    def _chat(self, phase: str, **kwargs):
+        """One chat completion, timed under phase, with its token usage counted."""
+        try:
+            with self.metrics.timer(phase):
+                response = self.client.chat.completions.create(**kwargs)
+        except Exception:
+            self.metrics.inc('analyzer_api_errors')
+            raise
+        self._record_usage(response)
+        return response
+
+    async def _chat_async(self, client, phase: str, **kwargs):
+        """_chat through the async client."""
+        try:
+            with self.metrics.timer(phase):
+                response = await client.chat.completions.create(**kwargs)
+        except Exception:
+            self.metrics.inc('analyzer_api_errors')
+            raise
+        self._record_usage(response)
+        return response
+
+    def _record_usage(self, response):
+        self.metrics.inc('analyzer_api_calls')
+        if response.usage is not None:
+            self.metrics.inc('analyzer_prompt_tokens', response.usage.prompt_tokens)
+            self.metrics.inc('analyzer_completion_tokens', response.usage.completion_tokens)
     
-    def read_reviews_from_csv(self, csv_path: str) -> List[Dict]:
+    def read_reviews_from_csv(self, csv_path: str) -> List[Review]:
         """
         Read reviews from CSV file generated by the scraper.
         
@@ -37,34 +88,35 @@ class ReviewAnalyzer:
             csv_path: Path to the CSV file
             
         Returns:
-            List of review dictionaries
+            List of Review objects
         """
         reviews = []
         try:
             with open(csv_path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 for row in reader:
-                    # Handle both 'review_text' (from scraper) and 'Review' (alternative format)
-                    review_text = row.get('review_text', '') or row.get('Review', '')
-                    reviews.append({
-                        'name': row.get('reviewer_name', '') or row.get('Name', ''),
+                    # Handle both the scraper's columns and the alternative capitalized format
+                    reviews.append(Review.from_row({
+                        'review_id': row.get('review_id', ''),
+                        'reviewer_name': row.get('reviewer_name', '') or row.get('Name', ''),
                         'rating': row.get('rating', '') or row.get('Rating', ''),
                         'date': row.get('date', '') or row.get('Date', ''),
-                        'review': review_text
-                    })
+                        'review_text': row.get('review_text', '') or row.get('Review', ''),
+                        'published': row.get('published', ''),
+                    }))
             print(f"[INFO] Loaded {len(reviews)} reviews from {csv_path}")
             return reviews
         except Exception as e:
             print(f"[ERROR] Failed to read CSV: {e}")
             return []
     
-    def identify_dynamic_categories(self, reviews: List[Dict]) -> Dict:
+    def identify_dynamic_categories(self, reviews: List[Review]) -> Dict:
         """
         Extract up to 4 positive and 4 negative categories from a sample of reviews.
         """
         # Use a representative sample of reviews (up to 30)
-        sample = [r for r in reviews if r['review'].strip()][:30]
-        review_texts = [f"- {r['review']}" for r in sample]
+        sample = [r for r in reviews if r.review_text.strip()][:30]
+        review_texts = [f"- {r.review_text}" for r in sample]
         
         reviews_joined = "\n".join(review_texts)
         prompt = f"""Analyze these customer reviews and identify the 4 most prominent POSITIVE themes and the 4 most prominent NEGATIVE themes.
@@ -83,7 +135,8 @@ INSTRUCTIONS:
 }}"""
 
         try:
-            response = self.client.chat.completions.create(
+            response = self._chat(
+                'analyzer_categories_api',
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a professional feedback analyst."},
@@ -100,26 +153,52 @@ INSTRUCTIONS:
                 "negatives": ["Service Issues", "Product Issues", "Environment Issues", "Value Issues"]
             }
 
-    def analyze_batch(self, reviews: List[Dict], dynamic_categories: Dict, batch_size: int = 20) -> Dict:
+    def analyze_batch(self, reviews: List[Review], dynamic_categories: Dict, batch_size: int = 20) -> Dict:
         """
         Analyze reviews in batches and map them to dynamic categories.
+
+        Batches are classified concurrently (see analyze_batch_async) and merged
+        in batch order, so the result does not depend on which request returns first.
+        """
+        return asyncio.run(self.analyze_batch_async(reviews, dynamic_categories, batch_size))
+
+    async def analyze_batch_async(self, reviews: List[Review], dynamic_categories: Dict, batch_size: int = 20) -> Dict:
+        """
+        Send the batch requests through the async client, at most self.concurrency
+        at a time and within the rpm / tpm ceilings, and merge their mappings in batch order.
         """
         all_mappings = {'positives': {}, 'negatives': {}}
         for cat in dynamic_categories['positives']: all_mappings['positives'][cat] = []
         for cat in dynamic_categories['negatives']: all_mappings['negatives'][cat] = []
-        
+
+        batches = []
         for i in range(0, len(reviews), batch_size):
             batch = reviews[i:i + batch_size]
-            print(f"[INFO] Analyzing batch {i//batch_size + 1}/{(len(reviews)-1)//batch_size + 1}...")
-            
             review_data = []
             for idx, r in enumerate(batch):
-                if r['review'].strip():
-                    review_data.append({"id": i + idx, "text": r['review'], "rating": r['rating']})
-            
-            if not review_data: continue
+                if r.review_text.strip():
+                    review_data.append({"id": i + idx, "text": r.review_text, "rating": r.rating})
+            if review_data:
+                batches.append((i // batch_size + 1, review_data))
+
+        total = (len(reviews) - 1) // batch_size + 1
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with AsyncOpenAI(api_key=self.api_key, base_url=self.base_url) as client:
+            # gather keeps the order of the batches, whatever order they finish in
+            batch_mappings = await asyncio.gather(*(
+                self._classify_batch(client, semaphore, number, total, review_data, dynamic_categories)
+                for number, review_data in batches
+            ))
+
+        for batch_mapping in batch_mappings:
+            if batch_mapping:
+                self._merge_batch_mapping(all_mappings, batch_mapping, dynamic_categories)
+        return all_mappings
 
-            prompt = f"""Map each review to ONE of the provided categories. 
+    async def _classify_batch(self, client, semaphore, number: int, total: int, review_data: List[Dict],
+                              dynamic_categories: Dict):
+        """Classify one batch. Returns its category -> review ids mapping, or None if the request failed."""
+        prompt = f"""Map each review to ONE of the provided categories. 
             
 CATEGORIES TO USE:
 {', '.join(dynamic_categories['positives'])}
@@ -140,8 +219,17 @@ Format:
   ...
 }}"""
 
+        async with semaphore:
+            if self.request_limiter:
+                await self.request_limiter.acquire_async()
+            if self.token_limiter:
+                # Usage is only known afterwards: estimate ~4 characters per prompt token
+                await self.token_limiter.acquire_async(len(prompt) // 4 + BATCH_COMPLETION_TOKENS)
+            print(f"[INFO] Analyzing batch {number}/{total}...")
             try:
-                response = self.client.chat.completions.create(
+                response = await self._chat_async(
+                    client,
+                    'analyzer_batch_api',
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": "You are a precise data classifier. Output ONLY JSON."},
@@ -150,40 +238,38 @@ Format:
                     temperature=0.1,
                     response_format={"type": "json_object"}
                 )
-                batch_mapping = json.loads(response.choices[0].message.content)
-                
-                # Merge into all_mappings with robust matching
-                for ai_cat, ids in batch_mapping.items():
-                    target_cat = None
-                    sentiment = None
-                    
-                    # Case-insensitive search in positive categories
-                    for cat in dynamic_categories['positives']:
-                        if ai_cat.lower().strip() == cat.lower().strip():
-                            target_cat = cat
-                            sentiment = 'positives'
-                            break
-                    
-                    # Case-insensitive search in negative categories if not found in positives
-                    if not target_cat:
-                        for cat in dynamic_categories['negatives']:
-                            if ai_cat.lower().strip() == cat.lower().strip():
-                                target_cat = cat
-                                sentiment = 'negatives'
-                                break
-                    
-                    if target_cat:
-                        # Ensure IDs are integers for Python (though JS handles strings)
-                        clean_ids = [int(id_val) for id_val in ids if str(id_val).isdigit()]
-                        all_mappings[sentiment][target_cat].extend(clean_ids)
-                    else:
-                        print(f"[DEBUG] Category '{ai_cat}' not found in dynamic themes")
-                        
+                return json.loads(response.choices[0].message.content)
             except Exception as e:
-                print(f"[ERROR] Batch analysis failed: {e}")
-                continue
-        
-        return all_mappings
+                print(f"[ERROR] Batch {number} analysis failed: {e}")
+                return None
+
+    def _merge_batch_mapping(self, all_mappings: Dict, batch_mapping: Dict, dynamic_categories: Dict):
+        """Merge one batch's mapping into all_mappings with robust matching."""
+        for ai_cat, ids in batch_mapping.items():
+            target_cat = None
+            sentiment = None
+            
+            # Case-insensitive search in positive categories
+            for cat in dynamic_categories['positives']:
+                if ai_cat.lower().strip() == cat.lower().strip():
+                    target_cat = cat
+                    sentiment = 'positives'
+                    break
+            
+            # Case-insensitive search in negative categories if not found in positives
+            if not target_cat:
+                for cat in dynamic_categories['negatives']:
+                    if ai_cat.lower().strip() == cat.lower().strip():
+                        target_cat = cat
+                        sentiment = 'negatives'
+                        break
+            
+            if target_cat:
+                # Ensure IDs are integers for Python (though JS handles strings)
+                clean_ids = [int(id_val) for id_val in ids if str(id_val).isdigit()]
+                all_mappings[sentiment][target_cat].extend(clean_ids)
+            else:
+                print(f"[DEBUG] Category '{ai_cat}' not found in dynamic themes")
 
     def _create_analysis_prompt(self, review_texts: List[str]) -> str:
         """Deprecated in favor of dynamic mapping."""
@@ -210,14 +296,16 @@ Format:
             print(f"[DEBUG] Response text: {response_text}")
             return {'positives': [], 'negatives': []}
     
-    def _aggregate_themes(self, mapping: Dict, reviews: List[Dict]) -> Dict:
+    def _aggregate_themes(self, mapping: Dict, reviews: List[Review]) -> Dict:
         """Aggregate data and include full review objects for the dashboard."""
         results = {
             'positives': [],
             'negatives': [],
             'total_positive_mentions': 0,
             'total_negative_mentions': 0,
-            'review_data': reviews # Keep original reviews for lookup
+            # Keep original reviews for lookup (JSON-ready, in the shape the dashboard reads)
+            'review_data': [{'name': r.reviewer_name, 'rating': r.rating, 'date': r.date, 'review': r.review_text,
+                             'published': r.published.isoformat() if r.published else ''} for r in reviews]
         }
         
         for cat, ids in mapping['positives'].items():
@@ -306,9 +394,48 @@ Format:
         # Read reviews
         reviews = self.read_reviews_from_csv(csv_path)
         
+        # Extract business name from CSV filename
+        business_name = os.path.splitext(os.path.basename(csv_path))[0].replace('_reviews', '').replace('-', ' ').title()
+        
+        results, _ = self._analyze(reviews, business_name, csv_path, output_path)
+        return results
+    
+    def analyze_reviews_from_store(self, store, output_folder: str, place_id: str = None, since=None, until=None,
+                                   category: str = None, output_path: str = None) -> Dict:
+        """
+        Analyze reviews queried from a ReviewStore instead of a CSV file, and store the results.
+        
+        Args:
+            store: ReviewStore to read the reviews from and save the analysis to
+            output_folder: Folder for the JSON results and the HTML dashboard
+            place_id: Only reviews of this place
+            since: Only reviews published on or after this date
+            until: Only reviews published on or before this date
+            category: Only places whose Google Maps category contains this text
+            output_path: Optional path to save the report (txt file)
+            
+        Returns:
+            Analysis results dictionary
+        """
+        reviews = store.query_reviews(place_id=place_id, since=since, until=until, category=category)
+        print(f"[INFO] Loaded {len(reviews)} reviews from {store.path}")
+        
+        place = store.place(place_id) if place_id else None
+        business_name = place.name if place and place.name else (category or 'All Places').title()
+        # JSON and dashboard files are named as if the reviews came from <name>_reviews.csv
+        base_name = re.sub(r'[^\w-]+', '-', business_name.lower()).strip('-') or 'reviews'
+        base_path = os.path.join(output_folder, f'{base_name}_reviews.csv')
+        
+        results, dynamic_cats = self._analyze(reviews, business_name, base_path, output_path)
+        if results:
+            store.save_analysis(place_id, dynamic_cats, results, reviews)
+        return results
+    
+    def _analyze(self, reviews: List[Review], business_name: str, base_path: str, output_path: str = None):
+        """Run the analysis, print and save the report, JSON and dashboard. Returns (results, categories)."""
         if not reviews:
             print("[ERROR] No reviews to analyze")
-            return {}
+            return {}, {}
         
         # Analyze reviews
         print(f"[INFO] Identifying dynamic categories...")
@@ -319,9 +446,6 @@ Format:
         mapping = self.analyze_batch(reviews, dynamic_cats)
         results = self._aggregate_themes(mapping, reviews)
         
-        # Extract business name from CSV filename
-        business_name = os.path.splitext(os.path.basename(csv_path))[0].replace('_reviews', '').replace('-', ' ').title()
-        
         # Generate report
         report = self.generate_report(results, business_name)
         
@@ -338,7 +462,7 @@ Format:
                 print(f"[ERROR] Failed to save report: {e}")
         
         # Also save JSON results
-        json_path = csv_path.replace('.csv', '_analysis.json')
+        json_path = base_path.replace('.csv', '_analysis.json')
         try:
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(results, f, indent=2, ensure_ascii=False)
@@ -349,7 +473,8 @@ Format:
         # Generate HTML dashboard
         try:
             from dashboard_generator import generate_html_dashboard
-            dashboard_path = generate_html_dashboard(results, business_name, csv_path)
+            with self.metrics.timer('dashboard'):
+                dashboard_path = generate_html_dashboard(results, business_name, base_path)
             
             if dashboard_path:
                 # Auto-open dashboard in browser
@@ -361,4 +486,4 @@ Format:
         except Exception as e:
             print(f"[WARNING] Failed to generate dashboard: {e}")
         
-        return results
+        return results, dynamic_cats
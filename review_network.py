@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read reviews from the Maps XHR responses instead of the rendered DOM.
+
+The reviews pane is filled from RPC responses (listugcposts, or the older
+listentitiesreviews). Chrome's performance log tells us when one of those
+responses finishes loading, and Network.getResponseBody gives us its payload,
+so every page the pane loads while scrolling is captured without touching a
+single review element. decode_review_payload() is a pure function and can be
+fed recorded payloads directly.
+"""
+
+import base64
+import json
+
+REVIEW_RPC_PATTERNS = ('/maps/rpc/listugcposts', '/maps/preview/review/listentitiesreviews')
+
+# Google prefixes JSON responses with this to prevent JSON hijacking
+XSSI_PREFIX = ")]}'"
+
+
+def _get(data, *path):
+    """Nested list lookup that returns None instead of raising on a missing index."""
+    for idx in path:
+        if not isinstance(data, list) or idx >= len(data):
+            return None
+        data = data[idx]
+    return data
+
+
+def _record(review_id, name, rating, date, text):
+    return {
+        'review_id': review_id or '',
+        'reviewer_name': name or '',
+        'rating': str(rating) if rating is not None else '',
+        'date': date or '',
+        'review_text': text or '',
+    }
+
+
+def _decode_listugcposts(data):
+    records = []
+    for entry in _get(data, 2) or []:
+        review = _get(entry, 0)
+        review_id = _get(review, 0)
+        if not isinstance(review_id, str):
+            continue
+        records.append(_record(
+            review_id,
+            _get(review, 1, 4, 5, 0),
+            _get(review, 2, 0, 0),
+            _get(review, 1, 6),
+            _get(review, 2, 15, 0, 0),
+        ))
+    return records
+
+
+def _decode_listentitiesreviews(data):
+    records = []
+    for review in _get(data, 2) or []:
+        review_id = _get(review, 10)
+        if not isinstance(review_id, str):
+            continue
+        records.append(_record(
+            review_id,
+            _get(review, 0, 1),
+            _get(review, 4),
+            _get(review, 1),
+            _get(review, 3),
+        ))
+    return records
+
+
+def decode_review_payload(body, url=''):
+    """
+    Decode one review RPC response body into review records (REVIEW_FIELDNAMES keys).
+    Returns [] for payloads that do not contain reviews.
+    """
+    body = body.strip()
+    if body.startswith(XSSI_PREFIX):
+        body = body[len(XSSI_PREFIX):]
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return []
+
+    if 'listentitiesreviews' in url:
+        return _decode_listentitiesreviews(data)
+    return _decode_listugcposts(data) or _decode_listentitiesreviews(data)
+
+
+class NetworkReviewCapture:
+    """
+    Collects review records from the network traffic of one driver.
+
+    The driver must have been started with performance logging enabled
+    (goog:loggingPrefs = {'performance': 'ALL'}), see GoogleMapsDataScraper.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pending = {}
+        self.records = {}
+
+    def reset(self):
+        """Forget everything captured so far (e.g. responses for the default sort order)."""
+        self.driver.get_log('performance')
+        self.pending = {}
+        self.records = {}
+
+    def collect(self):
+        """Decode every review response that finished since the last call. Returns all records so far."""
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if any(pattern in url for pattern in REVIEW_RPC_PATTERNS):
+                    self.pending[params['requestId']] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                url = self.pending.pop(params['requestId'])
+                self._read_body(params['requestId'], url)
+
+        return list(self.records.values())
+
+    def _read_body(self, request_id, url):
+        try:
+            response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            print(f"[DEBUG] Could not read review response body: {e}")
+            return
+
+        body = response.get('body', '')
+        if response.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+
+        for record in decode_review_payload(body, url):
+            self.records.setdefault(record['review_id'], record)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+from place_maps import MapsPlace, Review
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    run_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    keywords_file TEXT,
+    started_at    REAL NOT NULL,
+    finished_at   REAL
+);
+CREATE TABLE IF NOT EXISTS places (
+    place_id   TEXT PRIMARY KEY,
+    name       TEXT,
+    category   TEXT,
+    address    TEXT,
+    phone      TEXT,
+    web        TEXT,
+    pluscode   TEXT,
+    stars      REAL,
+    reviews    INTEGER,
+    hours      TEXT,
+    url        TEXT,
+    run_id     INTEGER REFERENCES scrape_runs(run_id),
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS places_category ON places(category);
+CREATE TABLE IF NOT EXISTS place_keywords (
+    keyword  TEXT NOT NULL,
+    place_id TEXT NOT NULL REFERENCES places(place_id),
+    PRIMARY KEY (keyword, place_id)
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id     TEXT PRIMARY KEY,
+    place_id      TEXT NOT NULL REFERENCES places(place_id),
+    reviewer_name TEXT,
+    rating        REAL,
+    date          TEXT,
+    published     TEXT,
+    review_text   TEXT,
+    run_id        INTEGER REFERENCES scrape_runs(run_id),
+    scraped_at    REAL
+);
+CREATE INDEX IF NOT EXISTS reviews_place_published ON reviews(place_id, published);
+CREATE INDEX IF NOT EXISTS reviews_published ON reviews(published);
+CREATE TABLE IF NOT EXISTS analysis_results (
+    analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    place_id    TEXT,
+    created_at  REAL NOT NULL,
+    categories  TEXT NOT NULL,
+    results     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS review_themes (
+    analysis_id INTEGER NOT NULL REFERENCES analysis_results(analysis_id),
+    review_id   TEXT NOT NULL,
+    sentiment   TEXT NOT NULL,
+    theme       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS review_themes_theme ON review_themes(theme);
+'''
+
+PLACE_COLUMNS = ('place_id', 'name', 'category', 'address', 'phone', 'web', 'pluscode', 'stars', 'reviews', 'hours',
+                 'url')
+
+
+class ReviewStore:
+    """
+    One SQLite database for every place, review, scrape run and analysis result.
+
+    Reviews are keyed by review id, so re-scraping a place never duplicates or
+    overwrites them, and they can be queried by place, publication date range,
+    place category or analysis theme without touching the per-keyword CSVs
+    (which remain available through export_csv).
+    """
+
+    def __init__(self, path, run_id=None):
+        """
+        Args:
+            path: Database file (created if missing).
+            run_id: Scrape run that places and reviews written through this store belong to
+                (see start_run; worker processes pass the id of the parent's run).
+        """
+        self.path = path
+        self.run_id = run_id
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def path_for(output_folder):
+        return os.path.join(output_folder, 'reviews.sqlite')
+
+    @staticmethod
+    def review_key(place_id, review):
+        """Review id, or a stable synthetic one for reviews scraped without an id."""
+        if review.review_id:
+            return review.review_id
+        digest = hashlib.sha1(f'{review.reviewer_name}_{review.date}_{review.review_text}'.encode('utf-8'))
+        return f'{place_id}:{digest.hexdigest()[:16]}'
+
+    def start_run(self, keywords_file=''):
+        with self.lock:
+            cursor = self.conn.execute('INSERT INTO scrape_runs (keywords_file, started_at) VALUES (?, ?)',
+                                       (keywords_file, time.time()))
+        self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def finish_run(self):
+        if self.run_id is None:
+            return
+        with self.lock:
+            self.conn.execute('UPDATE scrape_runs SET finished_at = ? WHERE run_id = ?', (time.time(), self.run_id))
+
+    def add_place(self, place):
+        """
+        Insert or refresh a place and link it to the keyword it was found by. Fields
+        the new data leaves empty (e.g. a harvested result card has no address) keep
+        their stored value.
+        """
+        if not place.place_id:
+            return
+        values = [getattr(place, column) for column in PLACE_COLUMNS]
+        updates = ', '.join(f"{column} = COALESCE(NULLIF(excluded.{column}, ''), {column})"
+                            for column in PLACE_COLUMNS[1:])
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                f'INSERT INTO places ({", ".join(PLACE_COLUMNS)}, run_id, updated_at) '
+                f'VALUES ({", ".join("?" * len(PLACE_COLUMNS))}, ?, ?) '
+                f'ON CONFLICT(place_id) DO UPDATE SET {updates}, run_id = excluded.run_id, '
+                f'updated_at = excluded.updated_at',
+                values + [self.run_id, time.time()]
+            )
+            if place.keyword:
+                self.conn.execute('INSERT OR IGNORE INTO place_keywords (keyword, place_id) VALUES (?, ?)',
+                                  (place.keyword, place.place_id))
+            self.conn.execute('COMMIT')
+
+    def add_reviews(self, place_id, reviews):
+        """
+        Bulk insert a place's reviews in one transaction. Reviews already stored keep
+        their first-seen published date. Returns the number of new reviews.
+        """
+        now = time.time()
+        rows = [
+            (self.review_key(place_id, r), place_id, r.reviewer_name, r.rating, r.date,
+             r.published.isoformat() if r.published else None, r.review_text, self.run_id, now)
+            for r in reviews
+        ]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute('BEGIN')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO reviews (review_id, place_id, reviewer_name, rating, date, published, '
+                'review_text, run_id, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.conn.execute('COMMIT')
+            return self.conn.total_changes - before
+
+    def review_ids(self, place_id):
+        """Ids of the reviews already stored for a place (for incremental scraping)."""
+        with self.lock:
+            rows = self.conn.execute('SELECT review_id FROM reviews WHERE place_id = ?', (place_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def place(self, place_id):
+        with self.lock:
+            row = self.conn.execute(
+                f'SELECT {", ".join(PLACE_COLUMNS)} FROM places WHERE place_id = ?', (place_id,)
+            ).fetchone()
+        return MapsPlace.from_dict(dict(zip(PLACE_COLUMNS, row))) if row else None
+
+    def query_reviews(self, place_id=None, since=None, until=None, category=None, theme=None, limit=None):
+        """
+        Reviews matching every given filter, newest first.
+
+        Args:
+            place_id: Only this place.
+            since: Only reviews published on or after this date (date or ISO string).
+            until: Only reviews published on or before this date.
+            category: Only places whose Google Maps category contains this text.
+            theme: Only reviews mapped to this theme by a stored analysis.
+            limit: At most this many reviews.
+        """
+        sql = ['SELECT r.review_id, r.reviewer_name, r.rating, r.date, r.review_text, r.published FROM reviews r']
+        where = []
+        params = []
+        if category:
+            sql.append('JOIN places p ON p.place_id = r.place_id')
+            where.append('p.category LIKE ?')
+            params.append(f'%{category}%')
+        if theme:
+            where.append('r.review_id IN (SELECT review_id FROM review_themes WHERE theme = ?)')
+            params.append(theme)
+        if place_id:
+            where.append('r.place_id = ?')
+            params.append(place_id)
+        if since:
+            where.append('r.published >= ?')
+            params.append(str(since))
+        if until:
+            where.append('r.published <= ?')
+            params.append(str(until))
+        if where:
+            sql.append('WHERE ' + ' AND '.join(where))
+        sql.append('ORDER BY r.published DESC, r.rowid')
+        if limit:
+            sql.append('LIMIT ?')
+            params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(' '.join(sql), params).fetchall()
+        return [Review.from_row(dict(zip(Review.FIELDS, row))) for row in rows]
+
+    def save_analysis(self, place_id, categories, results, reviews):
+        """
+        Store an analysis (categories and aggregated results) and the theme of each
+        review it mapped, so reviews can later be queried by theme.
+        """
+        themes = []
+        for sentiment in ('positives', 'negatives'):
+            for theme, _, ids in results.get(sentiment, []):
+                themes.extend((sentiment, theme, reviews[i].review_id) for i in ids if 0 <= i < len(reviews))
+
+        summary = {key: value for key, value in results.items() if key != 'review_data'}
+        with self.lock:
+            self.conn.execute('BEGIN')
+            cursor = self.conn.execute(
+                'INSERT INTO analysis_results (place_id, created_at, categories, results) VALUES (?, ?, ?, ?)',
+                (place_id, time.time(), json.dumps(categories, ensure_ascii=False),
+                 json.dumps(summary, ensure_ascii=False))
+            )
+            analysis_id = cursor.lastrowid
+            self.conn.executemany(
+                'INSERT INTO review_themes (analysis_id, review_id, sentiment, theme) VALUES (?, ?, ?, ?)',
+                [(analysis_id, review_id, sentiment, theme) for sentiment, theme, review_id in themes if review_id]
+            )
+            self.conn.execute('COMMIT')
+        return analysis_id
+
+    def export_csv(self, csv_path, **filters):
+        """Write the reviews matching query_reviews(**filters) in the scraper's review CSV format."""
+        reviews = self.query_reviews(**filters)
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=Review.FIELDS)
+            writer.writeheader()
+            writer.writerows(review.to_row() for review in reviews)
+        return len(reviews)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+from place_maps import MapsPlace
+
+
+class RunJournal:
+    """
+    Crash-safe record of a keyword run, stored in SQLite.
+
+    Each keyword's status (pending / done / failed) and its scraped MapsPlace
+    fields are committed as soon as the keyword finishes, so re-running the
+    same keywords file skips finished work and only retries failed or pending
+    keywords. Places found by harvesting a search are journaled as their own
+    entries (keyed by place URL, with the search as their source).
+    """
+
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword    TEXT PRIMARY KEY,
+                position   INTEGER NOT NULL,
+                status     TEXT NOT NULL DEFAULT 'pending',
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                place      TEXT,
+                error      TEXT,
+                updated_at REAL,
+                source     TEXT
+            )
+        ''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(keywords)')]
+        if 'source' not in columns:
+            # Journals written before results harvesting existed
+            self.conn.execute('ALTER TABLE keywords ADD COLUMN source TEXT')
+
+    @staticmethod
+    def path_for(output_folder, keywords_file):
+        """Journal file for a keywords file, kept next to the rest of the output."""
+        name = os.path.splitext(os.path.basename(keywords_file))[0]
+        return os.path.join(output_folder, f'{name}.journal.sqlite')
+
+    def register(self, keywords):
+        """Add keywords not seen before as pending. Existing entries keep their status."""
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO keywords (keyword, position, updated_at) VALUES (?, ?, ?)',
+                [(kw, position, time.time()) for position, kw in enumerate(keywords)]
+            )
+            self.conn.execute('COMMIT')
+
+    def pending(self, keywords=None):
+        """
+        Keywords still to scrape (pending or failed), in keywords-file order.
+        If keywords is given, only those and the places harvested from them.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT keyword, source FROM keywords WHERE status != ? ORDER BY position, rowid', (self.DONE,)
+            ).fetchall()
+        return [kw for kw, source in rows if keywords is None or kw in keywords or source in keywords]
+
+    def restart(self):
+        """Start a new run over the same keywords: everything goes back to pending and searches are harvested again."""
+        with self.lock:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM keywords WHERE source IS NOT NULL')
+            self.conn.execute('UPDATE keywords SET status = ?, error = NULL, updated_at = ?', (self.PENDING, time.time()))
+            self.conn.execute('COMMIT')
+
+    def mark_done(self, kw, place):
+        with self.lock:
+            self.conn.execute(
+                'UPDATE keywords SET status = ?, attempts = attempts + 1, place = ?, error = NULL, updated_at = ? '
+                'WHERE keyword = ?',
+                (self.DONE, json.dumps(place.to_dict(), ensure_ascii=False), time.time(), kw)
+            )
+
+    def add_harvest(self, kw, places, queue_details):
+        """
+        Record the places harvested from search kw and mark kw done. With
+        queue_details each place becomes a pending entry keyed by its URL, to be
+        scraped in full later; otherwise it is stored as done with its summary
+        fields. Places already journaled (e.g. by another search) are skipped.
+        Returns the URLs of the new pending entries.
+        """
+        now = time.time()
+        queued = []
+        with self.lock:
+            self.conn.execute('BEGIN')
+            position = self.conn.execute('SELECT position FROM keywords WHERE keyword = ?', (kw,)).fetchone()[0]
+            for place in places:
+                if queue_details:
+                    cursor = self.conn.execute(
+                        'INSERT OR IGNORE INTO keywords (keyword, position, updated_at, source) VALUES (?, ?, ?, ?)',
+                        (place.url, position, now, kw)
+                    )
+                    if cursor.rowcount:
+                        queued.append(place.url)
+                else:
+                    self.conn.execute(
+                        'INSERT OR IGNORE INTO keywords (keyword, position, status, place, updated_at, source) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (place.url, position, self.DONE, json.dumps(place.to_dict(), ensure_ascii=False), now, kw)
+                    )
+            self.conn.execute(
+                'UPDATE keywords SET status = ?, attempts = attempts + 1, place = NULL, error = NULL, updated_at = ? '
+                'WHERE keyword = ?',
+                (self.DONE, now, kw)
+            )
+            self.conn.execute('COMMIT')
+        return queued
+
+    def source(self, kw):
+        """The search a harvested place was found by ('' for keywords from the keywords file)."""
+        with self.lock:
+            row = self.conn.execute('SELECT source FROM keywords WHERE keyword = ?', (kw,)).fetchone()
+        return row[0] or '' if row else ''
+
+    def mark_failed(self, kw, error=''):
+        with self.lock:
+            self.conn.execute(
+                'UPDATE keywords SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? WHERE keyword = ?',
+                (self.FAILED, error, time.time(), kw)
+            )
+
+    def completed_places(self):
+        """All places scraped so far, across every run of this keywords file."""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT place, source FROM keywords WHERE status = ? AND place IS NOT NULL ORDER BY position, rowid',
+                (self.DONE,)
+            ).fetchall()
+
+        places = []
+        for place_json, source in rows:
+            place = MapsPlace.from_dict(json.loads(place_json))
+            if source:
+                # Harvested places are exported under the search that found them
+                place.keyword = source
+            places.append(place)
+        return places
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute('SELECT status, COUNT(*) FROM keywords GROUP BY status').fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
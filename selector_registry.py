@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from threading import Lock
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+
+def build_selector_chains(config):
+    """
+    Ordered (name, by, value) fallbacks for every element we look up, built once
+    per language from the scraper config instead of on every call.
+    """
+    def aria_label(text):
+        return [('aria-label', By.XPATH, f'//*[contains(@aria-label, "{text}")]')]
+
+    return {
+        'reviews': [
+            ('jftiEf class', By.CSS_SELECTOR, 'div.jftiEf'),
+            ('data-review-id', By.CSS_SELECTOR, 'div[data-review-id]'),
+            ('MyEned class', By.CSS_SELECTOR, 'div.MyEned'),
+            ('WNxzHc class', By.CSS_SELECTOR, 'div.WNxzHc'),
+            ('fontBodyMedium xpath', By.XPATH, '//div[contains(@class, "fontBodyMedium") and .//span[@role="img"]]'),
+        ],
+        'rating': [('stars img', By.XPATH, f'//*[contains(@aria-label, "{config["stars_text"]}") and @role="img"]')],
+        'review_count': aria_label(config['reviews_text']),
+        'category': [('category button', By.XPATH, '//button[contains(@jsaction, "pane.") and contains(@jsaction, ".category")]')],
+        'address': aria_label(config['address_text']),
+        'website': aria_label(config['website_text']),
+        'phone': aria_label(config['phone_text']),
+        'pluscode': aria_label(config['pluscode_text']),
+        'hours': aria_label(config['hours_text']),
+    }
+
+
+class SelectorRegistry:
+    """
+    Selector chains keyed by language that remember which selector won.
+
+    The last winning selector for a (language, kind) is tried first; the rest
+    of the chain is only walked when it stops matching. Hits and misses are
+    counted per selector, so the stats show when Google has rotated class
+    names (the primary selector stops matching and a fallback takes over).
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.chains = {}
+        self.winners = {}
+        self.stats = defaultdict(lambda: [0, 0])
+
+    def for_language(self, language, config):
+        """Selector view for one scraper; chains are built the first time a language is seen."""
+        with self.lock:
+            if language not in self.chains:
+                self.chains[language] = build_selector_chains(config)
+        return LanguageSelectors(self, language)
+
+    def ordered(self, language, kind):
+        """The chain for kind with the last winner moved to the front."""
+        chain = self.chains[language][kind]
+        winner = self.winners.get((language, kind))
+        if winner is None or winner == chain[0][0]:
+            return chain
+        return [s for s in chain if s[0] == winner] + [s for s in chain if s[0] != winner]
+
+    def record(self, language, kind, name, hit):
+        with self.lock:
+            self.stats[(language, kind, name)][0 if hit else 1] += 1
+            if hit:
+                self.winners[(language, kind)] = name
+
+    def merge(self, stats):
+        """Add hit/miss counts gathered elsewhere (e.g. by a worker process)."""
+        with self.lock:
+            for key, (hits, misses) in stats.items():
+                self.stats[key][0] += hits
+                self.stats[key][1] += misses
+
+    def snapshot(self):
+        with self.lock:
+            return {key: list(value) for key, value in self.stats.items()}
+
+    def print_stats(self):
+        stats = self.snapshot()
+        if not stats:
+            return
+        print('----------\nSelector hits / misses')
+        for (language, kind, name), (hits, misses) in sorted(stats.items()):
+            print(f'{language:<4}{kind:<14}{name:<24}{hits:>8}{misses:>8}')
+
+        # A fallback doing the work while the primary never matches usually means renamed classes
+        for language, chains in self.chains.items():
+            for kind, chain in chains.items():
+                primary = chain[0][0]
+                primary_hits = stats.get((language, kind, primary), [0, 0])[0]
+                fallback_hits = sum(stats.get((language, kind, s[0]), [0, 0])[0] for s in chain[1:])
+                if primary_hits == 0 and fallback_hits > 0:
+                    print(f"[WARNING] {language} {kind}: '{primary}' never matched but fallbacks did "
+                          f"({fallback_hits} times). Google may have renamed it.")
+
+
+class LanguageSelectors:
+    """The registry as seen by one scraper (a fixed language)."""
+
+    def __init__(self, registry, language):
+        self.registry = registry
+        self.language = language
+
+    def find_elements(self, driver, kind):
+        """Elements for the first selector in the chain that matches; [] if none does."""
+        for name, by, value in self.registry.ordered(self.language, kind):
+            elements = driver.find_elements(by, value)
+            self.registry.record(self.language, kind, name, bool(elements))
+            if elements:
+                return elements
+        return []
+
+    def find_element(self, driver, kind):
+        """Like find_elements but returns the first element; raises NoSuchElementException if none matched."""
+        elements = self.find_elements(driver, kind)
+        if not elements:
+            raise NoSuchElementException(f'No selector matched for {kind}')
+        return elements[0]
+
+    def locator(self, kind):
+        """(by, value) of the current best selector, for use in wait conditions."""
+        _, by, value = self.registry.ordered(self.language, kind)[0]
+        return by, value
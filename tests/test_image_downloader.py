@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from http.server import BaseHTTPRequestHandler
+from threading import Lock
+
+import pytest
+
+pytest.importorskip('requests')
+
+from image_downloader import ImageDownloader
+
+IMAGE = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+
+
+class ImageServer(BaseHTTPRequestHandler):
+    """Serves the same image at every /img/ path and 404 elsewhere; counts the requests."""
+
+    requests = []
+    lock = Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests.append(self.path)
+        if not self.path.startswith('/img/'):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_downloads_once_and_skips_duplicates(stand_in, tmp_path):
+    ImageServer.requests = []
+    base_url = stand_in(ImageServer)
+    downloader = ImageDownloader(max_workers=2)
+
+    assert downloader.submit(f'{base_url}/img/a.png', str(tmp_path / 'a.jpg'))
+    # Same URL again: skipped before any request
+    assert not downloader.submit(f'{base_url}/img/a.png', str(tmp_path / 'a2.jpg'))
+    # Different URL, identical bytes: downloaded, but not saved twice
+    assert downloader.submit(f'{base_url}/img/b.png', str(tmp_path / 'b.jpg'))
+    assert downloader.submit(f'{base_url}/missing.png', str(tmp_path / 'missing.jpg'))
+    downloader.close()
+
+    assert sorted(ImageServer.requests) == ['/img/a.png', '/img/b.png', '/missing.png']
+    saved = sorted(p.name for p in tmp_path.iterdir())
+    assert len(saved) == 1 and saved[0] in ('a.jpg', 'b.jpg')
+    assert (tmp_path / saved[0]).read_bytes() == IMAGE
+    assert downloader.stats == {'submitted': 3, 'saved': 1, 'skipped': 2, 'failed': 1}
+
+
+def test_existing_file_is_not_downloaded_again(stand_in, tmp_path):
+    ImageServer.requests = []
+    base_url = stand_in(ImageServer)
+    (tmp_path / 'a.jpg').write_bytes(b'already here')
+    downloader = ImageDownloader()
+
+    assert not downloader.submit(f'{base_url}/img/a.png', str(tmp_path / 'a.jpg'))
+    downloader.close()
+
+    assert ImageServer.requests == []
+    assert (tmp_path / 'a.jpg').read_bytes() == b'already here'
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from place_maps import MapsPlace
+from result_sink import CsvSink, JsonlSink
+
+
+def place(name):
+    p = MapsPlace()
+    p.keyword = 'cafes'
+    p.name = name
+    return p
+
+
+@pytest.mark.parametrize('sink_class, partial', [
+    (JsonlSink, '{"keyword": "cafes", "name": "cut", "addr'),
+    (CsvSink, 'cafes,cut,Calle'),
+])
+def test_resumed_stream_drops_a_record_cut_short_by_a_crash(tmp_path, sink_class, partial):
+    path = str(tmp_path / f'k.places.{sink_class.EXTENSION}')
+    sink = sink_class(path, fresh=True)
+    sink.write(place('a'))
+    sink.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(partial)
+
+    sink = sink_class(path)
+    sink.write(place('b'))
+    sink.close()
+
+    assert [p.name for p in sink_class.read_places(path)] == ['a', 'b']
+
+
+def test_resumed_stream_with_only_a_partial_header_starts_over(tmp_path):
+    path = str(tmp_path / 'k.places.csv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('keyword,na')
+
+    sink = CsvSink(path)
+    sink.write(place('a'))
+    sink.close()
+
+    assert [p.name for p in CsvSink.read_places(path)] == ['a']
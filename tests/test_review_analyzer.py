@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler
+from threading import Lock
+
+import pytest
+
+pytest.importorskip('openai')
+pytest.importorskip('dotenv')
+
+from place_maps import Review
+from review_analyzer import ReviewAnalyzer
+
+CATEGORIES = {'positives': ['Service', 'Coffee'], 'negatives': ['Waiting', 'Price']}
+
+
+class ChatCompletions(BaseHTTPRequestHandler):
+    """
+    OpenAI-compatible /v1/chat/completions stand-in. Maps even review ids to
+    'Service' and odd ones to 'waiting' (wrong case on purpose), and answers the
+    first batches last, so merging in completion order would scramble the result.
+    """
+
+    lock = Lock()
+    in_flight = 0
+    peak = 0
+    calls = 0
+
+    def do_POST(self):
+        cls = type(self)
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        ids = [int(i) for i in re.findall(r'"id": (\d+)', request['messages'][1]['content'])]
+        with cls.lock:
+            cls.in_flight += 1
+            cls.calls += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(max(0.1, 0.5 - ids[0] / 200))
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+        content = json.dumps({'Service': [i for i in ids if i % 2 == 0], 'waiting': [i for i in ids if i % 2]})
+        body = json.dumps({
+            'id': f'chatcmpl-{ids[0]}', 'object': 'chat.completion', 'created': int(time.time()),
+            'model': request['model'],
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(stand_in):
+    ChatCompletions.in_flight = ChatCompletions.peak = ChatCompletions.calls = 0
+    return stand_in(ChatCompletions) + '/v1'
+
+
+def reviews(count):
+    return [Review(review_id=str(i), review_text=f'review {i}', rating=4.0) for i in range(count)]
+
+
+def test_batches_run_concurrently_and_merge_in_batch_order(api):
+    analyzer = ReviewAnalyzer(api_key='test', base_url=api, concurrency=4)
+
+    mapping = analyzer.analyze_batch(reviews(200), CATEGORIES, batch_size=20)
+
+    assert mapping['positives'] == {'Service': list(range(0, 200, 2)), 'Coffee': []}
+    assert mapping['negatives'] == {'Waiting': list(range(1, 200, 2)), 'Price': []}
+    assert ChatCompletions.calls == 10
+    assert 1 < ChatCompletions.peak <= 4
+    counters = analyzer.metrics.summary()['counters']
+    assert counters['analyzer_api_calls'] == 10
+    assert counters['analyzer_prompt_tokens'] == 1000
+
+
+def test_empty_reviews_are_not_sent(api):
+    analyzer = ReviewAnalyzer(api_key='test', base_url=api, concurrency=4)
+    batch = reviews(40)
+    for review in batch[:20]:
+        review.review_text = ' '
+
+    mapping = analyzer.analyze_batch(batch, CATEGORIES, batch_size=20)
+
+    assert ChatCompletions.calls == 1
+    assert mapping['positives']['Service'] == list(range(20, 40, 2))
+
+
+def test_requests_per_minute_ceiling(api):
+    # 600 rpm = one request every 0.1 s once the burst (the concurrency, 2) is spent
+    analyzer = ReviewAnalyzer(api_key='test', base_url=api, concurrency=2, rpm=600)
+
+    start = time.perf_counter()
+    analyzer.analyze_batch(reviews(120), CATEGORIES, batch_size=20)
+
+    assert ChatCompletions.calls == 6
+    assert time.perf_counter() - start >= 0.4
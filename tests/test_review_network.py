@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import json
+import urllib.request
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from conftest import read_fixture
+from place_maps import review_rows
+from review_network import NetworkReviewCapture, decode_review_payload
+
+UGC_URL = '/maps/rpc/listugcposts?authuser=0&hl=en&pb=!1m6'
+ENTITIES_URL = '/maps/preview/review/listentitiesreviews?authuser=0&hl=en&pb=!1m2'
+
+
+def test_decode_listugcposts():
+    records = decode_review_payload(read_fixture('listugcposts.txt'), UGC_URL)
+
+    assert [r['review_id'] for r in records] == [
+        'ChZDSUhNMG9nS0VJQ0FnSURyOC1xdFNREAE',
+        'ChdDSUhNMG9nS0VJQ0FnSURidWZQZmlBRRAB',
+        'ChZDSUhNMG9nS0VJQ0FnSUNyNGZUcVZBEAE',
+    ]
+    assert records[0] == {
+        'review_id': 'ChZDSUhNMG9nS0VJQ0FnSURyOC1xdFNREAE',
+        'reviewer_name': 'Ana García',
+        'rating': '5',
+        'date': 'hace 2 semanas',
+        'review_text': 'Café excelente, el personal muy amable.',
+    }
+    assert records[1]['review_text'] == 'Slow service.\nCold coffee.'
+    # A rating without text
+    assert records[2]['rating'] == '4' and records[2]['review_text'] == ''
+
+
+def test_decode_listentitiesreviews():
+    records = decode_review_payload(read_fixture('listentitiesreviews.txt'), ENTITIES_URL)
+
+    assert [(r['reviewer_name'], r['rating'], r['date']) for r in records] == [
+        ('Marie Curie', '5', 'a month ago'),
+        ('Pierre', '3', '5 days ago'),
+    ]
+
+
+@pytest.mark.parametrize('body', ['', ")]}'\n", ")]}'\n[null", ")]}'\n[null, null, []]", '{"error": 1}'])
+def test_decode_ignores_payloads_without_reviews(body):
+    assert decode_review_payload(body, UGC_URL) == []
+
+
+class RecordedPayloads(BaseHTTPRequestHandler):
+    """Serves the recorded RPC responses at their Maps paths."""
+
+    def do_GET(self):
+        name = 'listentitiesreviews.txt' if 'listentitiesreviews' in self.path else 'listugcposts.txt'
+        body = read_fixture(name).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PerformanceLogDriver:
+    """
+    Stands in for a Chrome driver with performance logging: the log announces
+    each URL as a finished response, and Network.getResponseBody fetches it.
+    """
+
+    def __init__(self, urls):
+        self.urls = dict(enumerate(urls))
+        self.log = []
+        for request_id, url in self.urls.items():
+            self.log.append({'method': 'Network.responseReceived',
+                             'params': {'requestId': str(request_id), 'response': {'url': url}}})
+            self.log.append({'method': 'Network.loadingFinished', 'params': {'requestId': str(request_id)}})
+
+    def get_log(self, kind):
+        entries = [{'message': json.dumps({'message': message})} for message in self.log]
+        self.log = []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, params):
+        with urllib.request.urlopen(self.urls[int(params['requestId'])]) as response:
+            body = response.read()
+        return {'body': base64.b64encode(body).decode('ascii'), 'base64Encoded': True}
+
+
+def test_capture_reads_review_responses_from_stand_in(stand_in):
+    base_url = stand_in(RecordedPayloads)
+    driver = PerformanceLogDriver([
+        base_url + UGC_URL,
+        base_url + '/maps/vt/tile?x=1',
+        base_url + ENTITIES_URL,
+        # The same page loaded twice while scrolling
+        base_url + UGC_URL,
+    ])
+
+    records = NetworkReviewCapture(driver).collect()
+
+    assert len(records) == 5
+    assert len({r['review_id'] for r in records}) == 5
+    assert records[0]['reviewer_name'] == 'Ana García'
+
+
+def test_review_rows_types_and_deduplicates_captured_records():
+    records = decode_review_payload(read_fixture('listugcposts.txt'), UGC_URL)
+    reference = datetime(2025, 5, 10, 12, 0)
+
+    rows = review_rows(records + records[:1], 10, 'ES', reference)
+
+    assert [r.reviewer_name for r in rows] == ['Ana García', 'John Smith', 'Rating Only']
+    assert [r.rating for r in rows] == [5.0, 2.0, 4.0]
+    assert [r.published for r in rows] == [date(2025, 4, 26), date(2025, 5, 10), date(2024, 5, 10)]
+    assert len(review_rows(records, 2, 'EN', reference)) == 2
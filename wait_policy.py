@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+import random
+import time
+from collections import defaultdict
+from threading import Lock
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class WaitPolicy:
+    """
+    Waits on DOM conditions instead of fixed sleeps.
+
+    Every wait belongs to a named step with its own timeout, and the time spent
+    in each step is recorded so a run can show where the waiting happens.
+    The politeness floor (a short random pause between places) is configured
+    separately from the step timeouts; with a rate limiter, a shared request
+    budget paces navigations and searches instead.
+    """
+
+    DEFAULT_TIMEOUTS = {
+        'home': 15,
+        'search_box': 10,
+        'search_results': 15,
+        'place_details': 10,
+        'rating': 5,
+        'reviews_tab': 5,
+        'sort_menu': 5,
+        'reviews': 10,
+        'scroll_reviews': 120,
+        'scroll_results': 60,
+        # Driver-level limits: a page load or script that exceeds these raises instead of hanging
+        'page_load': 30,
+        'script': 30,
+    }
+
+    def __init__(self, timeouts=None, politeness_min=0.5, politeness_max=1.5, poll_frequency=0.1,
+                 scroll_interval=0.3, scroll_max_interval=2.0, scroll_stable_ticks=4, rate_limiter=None):
+        """
+        Args:
+            timeouts: Optional dict overriding DEFAULT_TIMEOUTS per step (seconds).
+            politeness_min: Lower bound of the random pause between places (seconds).
+            politeness_max: Upper bound of the random pause between places (seconds).
+            poll_frequency: How often conditions are re-checked (seconds).
+            scroll_interval: Initial pause between scroll ticks of a lazy-loaded list (seconds).
+            scroll_max_interval: Longest pause the scroll back-off grows to (seconds).
+            scroll_stable_ticks: Stop scrolling after this many ticks without new items.
+            rate_limiter: Optional RateLimiter / SharedRateLimiter every navigation and search
+                acquires from; replaces the politeness floor.
+        """
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.politeness_min = politeness_min
+        self.politeness_max = max(politeness_min, politeness_max)
+        self.poll_frequency = poll_frequency
+        self.scroll_interval = scroll_interval
+        self.scroll_max_interval = max(scroll_interval, scroll_max_interval)
+        self.scroll_stable_ticks = scroll_stable_ticks
+        self.rate_limiter = rate_limiter
+        self.timings = defaultdict(list)
+        self.lock = Lock()
+
+    def until(self, driver, step, condition, timeout=None):
+        """Wait until condition is truthy. Raises TimeoutException like WebDriverWait."""
+        if timeout is None:
+            timeout = self.timeouts.get(step, 10)
+        start = time.perf_counter()
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency,
+                                 ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+        finally:
+            self.record(step, time.perf_counter() - start)
+
+    def until_or_none(self, driver, step, condition, timeout=None):
+        """Same as until() but returns None on timeout instead of raising."""
+        try:
+            return self.until(driver, step, condition, timeout)
+        except TimeoutException:
+            print(f"[DEBUG] Timed out waiting for step: {step}")
+            return None
+
+    def acquire(self):
+        """Take one request from the rate limiter before a navigation or search (no-op without one)."""
+        if self.rate_limiter is None:
+            return
+        self.record('rate_limit', self.rate_limiter.acquire())
+
+    def polite_pause(self):
+        """Sleep for the politeness floor (random within min/max), unless a rate limiter paces requests."""
+        if self.rate_limiter is not None or self.politeness_max <= 0:
+            return
+        delay = random.uniform(self.politeness_min, self.politeness_max)
+        time.sleep(delay)
+        self.record('politeness', delay)
+
+    def record(self, step, elapsed):
+        with self.lock:
+            self.timings[step].append(elapsed)
+
+    def merge(self, timings):
+        """Add timings recorded elsewhere (e.g. by a worker process) to this policy."""
+        with self.lock:
+            for step, values in timings.items():
+                self.timings[step].extend(values)
+
+    def summary(self):
+        """Return {step: {'count', 'total', 'avg', 'max'}} for every recorded step."""
+        with self.lock:
+            snapshot = {step: list(values) for step, values in self.timings.items()}
+
+        result = {}
+        for step, values in snapshot.items():
+            total = sum(values)
+            result[step] = {
+                'count': len(values),
+                'total': total,
+                'avg': total / len(values),
+                'max': max(values),
+            }
+        return result
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print('----------\nWait time per step')
+        print(f'{"STEP":<18}{"COUNT":>8}{"TOTAL (s)":>12}{"AVG (s)":>10}{"MAX (s)":>10}')
+        for step, s in sorted(summary.items(), key=lambda item: item[1]['total'], reverse=True):
+            print(f'{step:<18}{s["count"]:>8}{s["total"]:>12.1f}{s["avg"]:>10.2f}{s["max"]:>10.2f}')
+
+
+def place_title_loaded(driver):
+    """Condition: a place page is open, i.e. there is a non-empty h1 that is not the results header."""
+    for title in driver.find_elements(By.TAG_NAME, 'h1'):
+        text = title.text.strip()
+        if text not in ('', 'Results', 'Resultados'):
+            return title
+    return False
+
+
+def place_title_changed(previous):
+    """
+    Condition factory: like place_title_loaded, but the title of the place that was
+    open before (previous, from place_title_loaded; None if there was none) does not
+    count until it is replaced or its text changes. Google Maps keeps the old h1 in
+    the page while a new search or place is loading.
+    """
+    try:
+        previous_text = previous.text.strip() if previous else ''
+    except StaleElementReferenceException:
+        previous, previous_text = None, ''
+
+    def condition(driver):
+        title = place_title_loaded(driver)
+        if not title or previous is None or title != previous:
+            return title
+        return title if title.text.strip() != previous_text else False
+
+    return condition